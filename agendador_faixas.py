@@ -0,0 +1,262 @@
+# Agendador de várias faixas (câmeras) em um único processo, com um só modelo de OCR
+# compartilhado por um pool de workers.
+# Uso: python agendador_faixas.py --faixa entrada1,entrada,video1.mp4 --faixa saida1,saida,rtsp://cam2/stream \
+#          --workers 2 --saida decisoes.jsonl
+# Prioridade: faixas de entrada com carro aguardando > demais faixas ativas > faixas ociosas.
+# Dentro da mesma classe, a faixa que recebeu menos tempo de OCR (ponderado pelo peso) vai primeiro.
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from cache_ocr import CacheOCR
+from ingestao_video import amostrar_quadros, abrir_saida, fechar_saida, gravar_decisao
+
+TIPOS_FAIXA = ('entrada', 'saida')
+
+
+class Faixa:
+    def __init__(self, nome, fonte, tipo='entrada', peso=1.0, tamanho_fila=4, descartar_quando_cheia=True,
+                 modo='passo', passo=1, intervalo=1.0, velocidade=0.0,
+                 limiar_movimento=4.0, tempo_ocioso=5.0, intervalo_ocioso=2.0):
+        if tipo not in TIPOS_FAIXA:
+            raise ValueError(f"Tipo de faixa inválido: {tipo} (use {', '.join(TIPOS_FAIXA)})")
+        self.nome = nome
+        self.fonte = fonte
+        self.tipo = tipo
+        self.peso = peso
+        self.tamanho_fila = tamanho_fila
+        self.descartar_quando_cheia = descartar_quando_cheia
+        self.amostragem = (modo, passo, intervalo, velocidade)
+        self.limiar_movimento = limiar_movimento
+        self.tempo_ocioso = tempo_ocioso
+        self.intervalo_ocioso = intervalo_ocioso
+
+        self.fila = deque()  # (instante de chegada, indice, tempo_ms, quadro)
+        self.encerrada = False
+        self.servico = 0.0  # segundos de OCR recebidos / peso
+        self.ultimo_movimento = 0.0
+        self.ultima_placa = 0.0
+        self.ultima_vez = {}  # placa -> instante da última decisão
+        self.latencias = deque(maxlen=200)
+        self.cache_ocr = None  # criado pelo agendador com a configuração do app
+        self.contadores = {'quadros': 0, 'enfileirados': 0, 'descartados': 0, 'throttled': 0,
+                           'processados': 0, 'decisoes': 0}
+
+    def ociosa(self, agora):
+        return agora - max(self.ultimo_movimento, self.ultima_placa) > self.tempo_ocioso
+
+    def metricas(self):
+        latencias = sorted(self.latencias)
+        return dict(
+            self.contadores,
+            fila=len(self.fila),
+            latencia_media_ms=round(sum(latencias) / len(latencias) * 1000, 1) if latencias else None,
+            latencia_p95_ms=round(latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))] * 1000, 1)
+            if latencias else None,
+            cache=self.cache_ocr.metricas() if self.cache_ocr else None,
+        )
+
+
+class AgendadorFaixas:
+    def __init__(self, app, faixas, workers=2, saida=None, espera_maxima=3.0, janela_carro=3.0,
+                 intervalo_repeticao=10.0):
+        self.app = app
+        self.faixas = list(faixas)
+        self.quantidade_workers = workers
+        self.saida = saida
+        self.espera_maxima = espera_maxima  # envelhecimento: evita inanição das faixas de baixa prioridade
+        self.janela_carro = janela_carro
+        self.intervalo_repeticao = intervalo_repeticao
+        # Um cache por faixa: as entradas não guardam a câmera de origem, e cenas parecidas
+        # (faixas vazias, à noite) dariam a uma faixa a placa e a caixa lidas em outra
+        base = app.cache_ocr
+        for faixa in self.faixas:
+            faixa.cache_ocr = CacheOCR(base.capacidade, base.ttl)
+
+        self._condicao = threading.Condition()
+        self._lock_banco = threading.Lock()  # a conexão SQLite do app é compartilhada pelos workers
+        self._parar = threading.Event()
+        self._threads = []
+        self._arquivo = None
+
+    # --- Captura ---------------------------------------------------------------
+
+    def _capturar(self, faixa):
+        modo, passo, intervalo, velocidade = faixa.amostragem
+        anterior = None
+        ultimo_enfileirado = 0.0
+        try:
+            for indice, tempo_ms, quadro in amostrar_quadros(faixa.fonte, modo, passo, intervalo, velocidade):
+                if self._parar.is_set():
+                    break
+                agora = time.monotonic()
+                faixa.contadores['quadros'] += 1
+
+                # Detector de movimento barato em uma miniatura em cinza
+                miniatura = cv2.resize(cv2.cvtColor(quadro, cv2.COLOR_BGR2GRAY), (64, 36), interpolation=cv2.INTER_AREA)
+                if anterior is not None and cv2.absdiff(miniatura, anterior).mean() > faixa.limiar_movimento:
+                    faixa.ultimo_movimento = agora
+                anterior = miniatura
+
+                # Faixa ociosa: só um quadro a cada intervalo_ocioso segundos
+                if faixa.ociosa(agora) and agora - ultimo_enfileirado < faixa.intervalo_ocioso:
+                    faixa.contadores['throttled'] += 1
+                    continue
+                if self._enfileirar(faixa, (agora, indice, tempo_ms, quadro)):
+                    ultimo_enfileirado = agora
+        finally:
+            with self._condicao:
+                faixa.encerrada = True
+                self._condicao.notify_all()
+
+    def _enfileirar(self, faixa, item):
+        with self._condicao:
+            while len(faixa.fila) >= faixa.tamanho_fila:
+                if faixa.descartar_quando_cheia:
+                    # Quadro mais antigo perde a vez: o mais recente mostra a situação atual da cancela
+                    faixa.fila.popleft()
+                    faixa.contadores['descartados'] += 1
+                else:
+                    self._condicao.wait(0.5)
+                    if self._parar.is_set():
+                        return False
+            if not faixa.fila:
+                # Faixa voltando a ter trabalho não herda crédito do tempo em que ficou parada
+                pendentes = [outra.servico for outra in self.faixas if outra.fila]
+                if pendentes:
+                    faixa.servico = max(faixa.servico, min(pendentes))
+            faixa.fila.append(item)
+            faixa.contadores['enfileirados'] += 1
+            self._condicao.notify_all()
+            return True
+
+    # --- Escalonamento ---------------------------------------------------------
+
+    def _classe(self, faixa, agora):
+        if agora - faixa.fila[0][0] > self.espera_maxima:
+            return 0
+        if faixa.tipo == 'entrada' and agora - max(faixa.ultimo_movimento, faixa.ultima_placa) < self.janela_carro:
+            return 0
+        return 2 if faixa.ociosa(agora) else 1
+
+    def _proximo(self):
+        # Bloqueia até haver trabalho; retorna None quando tudo terminou
+        with self._condicao:
+            while True:
+                agora = time.monotonic()
+                candidatas = [faixa for faixa in self.faixas if faixa.fila]
+                if candidatas:
+                    faixa = min(candidatas, key=lambda f: (self._classe(f, agora), f.servico))
+                    item = faixa.fila.popleft()
+                    self._condicao.notify_all()  # libera capturas esperando espaço
+                    return faixa, item
+                if self._parar.is_set() or all(faixa.encerrada for faixa in self.faixas):
+                    return None
+                self._condicao.wait(0.5)
+
+    # --- Reconhecimento --------------------------------------------------------
+
+    def _trabalhar(self):
+        while True:
+            proximo = self._proximo()
+            if proximo is None:
+                return
+            faixa, (chegada, indice, tempo_ms, quadro) = proximo
+            inicio = time.monotonic()
+            placa, recorte = self.app.ler_placa_com_recorte(quadro, faixa.cache_ocr)
+            fim = time.monotonic()
+            with self._condicao:
+                faixa.servico += (fim - inicio) / faixa.peso
+                faixa.contadores['processados'] += 1
+                faixa.latencias.append(fim - chegada)
+                if placa:
+                    faixa.ultima_placa = fim
+            if placa:
+                self._decidir(faixa, placa, recorte, indice, tempo_ms, fim)
+
+    def _decidir(self, faixa, placa, recorte, indice, tempo_ms, agora):
+        with self._lock_banco:
+            # O mesmo carro parado na cancela gera uma única decisão por janela
+            if agora - faixa.ultima_vez.get(placa, float('-inf')) < self.intervalo_repeticao:
+                return
+            faixa.ultima_vez[placa] = agora
+            resultado = self.app.avaliar_placa(placa)
+            gravar_decisao(self.app, self._arquivo, resultado, recorte,
+                           faixa=faixa.nome, tipo_faixa=faixa.tipo, quadro=indice, tempo_ms=round(tempo_ms))
+            faixa.contadores['decisoes'] += 1
+
+    # --- Ciclo de vida ---------------------------------------------------------
+
+    def iniciar(self):
+        self._arquivo = abrir_saida(self.saida)
+        for faixa in self.faixas:
+            self._threads.append(threading.Thread(target=self._capturar, args=(faixa,),
+                                                  name=f"captura-{faixa.nome}", daemon=True))
+        for numero in range(self.quantidade_workers):
+            self._threads.append(threading.Thread(target=self._trabalhar, name=f"ocr-{numero}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def aguardar(self, timeout=None):
+        # Retorna quando todas as faixas terminaram (vídeos gravados) ou após parar()
+        limite = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if limite is None else max(0.0, limite - time.monotonic()))
+        fechar_saida(self._arquivo)
+        return self.metricas()
+
+    def parar(self):
+        self._parar.set()
+        with self._condicao:
+            self._condicao.notify_all()
+
+    def metricas(self):
+        with self._condicao:
+            return {faixa.nome: faixa.metricas() for faixa in self.faixas}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processa várias faixas com um pool compartilhado de OCR")
+    parser.add_argument('--faixa', action='append', required=True, metavar='NOME,TIPO,FONTE',
+                        help="Ex.: entrada1,entrada,video1.mp4 (repita para cada faixa)")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--fila', type=int, default=4, help="Quadros pendentes por faixa")
+    parser.add_argument('--sem-descarte', action='store_true',
+                        help="Fila cheia segura a captura em vez de descartar (auditoria de gravações)")
+    parser.add_argument('--modo', choices=('passo', 'tempo', 'chave'), default='passo')
+    parser.add_argument('--passo', type=int, default=1)
+    parser.add_argument('--intervalo', type=float, default=1.0)
+    parser.add_argument('--velocidade', type=float, default=1.0, help="1 = tempo real; 0 = sem espera")
+    parser.add_argument('--saida', help="Arquivo JSONL ('-' para stdout); sem esta opção grava no banco")
+    parser.add_argument('--banco', default='placas_liberadas.db')
+    parser.add_argument('--motor', choices=('easyocr', 'onnx'), default='easyocr')
+    args = parser.parse_args(argv)
+
+    faixas = []
+    for definicao in args.faixa:
+        partes = definicao.split(',', 2)
+        if len(partes) != 3:
+            parser.error(f"Faixa inválida: {definicao} (use NOME,TIPO,FONTE)")
+        nome, tipo, fonte = partes
+        faixas.append(Faixa(nome, fonte, tipo, tamanho_fila=args.fila, descartar_quando_cheia=not args.sem_descarte,
+                            modo=args.modo, passo=args.passo, intervalo=args.intervalo, velocidade=args.velocidade))
+
+    from placa_reader import PlacaReaderApp
+    app = PlacaReaderApp(args.banco, motor_ocr=args.motor)
+    agendador = AgendadorFaixas(app, faixas, workers=args.workers, saida=args.saida)
+    agendador.iniciar()
+    try:
+        metricas = agendador.aguardar()
+    except KeyboardInterrupt:
+        agendador.parar()
+        metricas = agendador.aguardar(timeout=5)
+    print(json.dumps(metricas, ensure_ascii=False, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
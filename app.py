@@ -4,24 +4,41 @@ import streamlit as st
 import sqlite3
 from datetime import datetime
 import re
-import pandas as pd
 from PIL import Image
 import io
 import uuid
 import cv2
-import pytesseract
 import numpy as np
+from estatisticas import (criar_tabelas_estatisticas, reconstruir_estatisticas, acumular_acesso,
+                          acessos_por_periodo, taxa_negacao_por_tipo, top_veiculos, periodo_padrao)
+from arquivamento import MESES_RETENCAO_PADRAO, precisa_arquivar, arquivar_acessos, consultar_periodo
+from cache_ocr import CacheOCR
+from importacao import importar_colaboradores, importar_veiculos
+from evidencias import ArmazemEvidencias
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title="Controle de Acesso Carbon", layout="wide", page_icon="🚗")
 
 # Configuração do Tesseract (descomente e ajuste o caminho se necessário)
-# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+TESSERACT_CMD = None  # ex.: r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+# Cache do OCR: recortes idênticos (ex.: reruns com a mesma foto) reutilizam o resultado anterior
+OCR_CACHE_CAPACIDADE = 256
+OCR_CACHE_TTL_SEGUNDOS = 300
+
+# Recortes das placas usados como evidência de cada acesso (fora do banco)
+EVIDENCIAS_PASTA = 'carbon_access_evidencias'
 
 class VehicleAccessSystem:
-    def __init__(self):
-        self.conn = sqlite3.connect('carbon_access.db', check_same_thread=False)
+    def __init__(self, db_path='carbon_access.db', meses_retencao=MESES_RETENCAO_PADRAO, evidencias=None):
+        self.db_path = db_path
+        self.meses_retencao = meses_retencao
+        self.evidencias = evidencias
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.create_database()
+        # Move meses fora da retenção para os arquivos mensais
+        if precisa_arquivar(self.conn, self.meses_retencao):
+            self.archive_old_accesses()
 
     def create_database(self):
         cursor = self.conn.cursor()
@@ -57,7 +74,13 @@ class VehicleAccessSystem:
                 FOREIGN KEY (veiculo_id) REFERENCES veiculos(id)
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_acessos_data_hora ON acessos (data_hora)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_acessos_veiculo_data_hora ON acessos (veiculo_id, data_hora)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_veiculos_colaborador ON veiculos (colaborador_id)")
         self.conn.commit()
+        # Rollups para o painel; bancos existentes recebem backfill na primeira execução
+        if criar_tabelas_estatisticas(self.conn):
+            reconstruir_estatisticas(self.conn, self.db_path)
 
     def validate_plate(self, placa):
         placa = placa.replace(" ", "").replace("-", "").upper()
@@ -95,6 +118,42 @@ class VehicleAccessSystem:
         ''', (colaborador_id,))
         return cursor.fetchall()
 
+    def get_employees_overview(self, employees, acessos_por_veiculo=5):
+        # Veículos e últimos acessos dos colaboradores já carregados (linhas de get_employees_by_name),
+        # com número fixo de consultas; as fotos não são buscadas de novo
+        overview = {}
+        for emp in employees:
+            overview.setdefault(emp[0], {'employee': emp, 'vehicles': [], 'accesses': {}})
+        ids = list(overview)
+        cursor = self.conn.cursor()
+        # Lotes abaixo do limite de parâmetros do SQLite
+        for inicio in range(0, len(ids), 500):
+            lote = ids[inicio:inicio + 500]
+            marcadores = ", ".join("?" * len(lote))
+            cursor.execute(f'''
+                SELECT colaborador_id, placa, modelo, marca, cor, tipo_veiculo
+                FROM veiculos
+                WHERE colaborador_id IN ({marcadores})
+                ORDER BY id
+            ''', lote)
+            for colaborador_id, *vehicle in cursor.fetchall():
+                overview[colaborador_id]['vehicles'].append(tuple(vehicle))
+            cursor.execute(f'''
+                SELECT colaborador_id, placa, data_hora, acesso_permitido, observacoes
+                FROM (
+                    SELECT v.colaborador_id, v.placa, a.data_hora, a.acesso_permitido, a.observacoes,
+                           ROW_NUMBER() OVER (PARTITION BY a.veiculo_id ORDER BY a.data_hora DESC) AS ordem
+                    FROM acessos a
+                    JOIN veiculos v ON a.veiculo_id = v.id
+                    WHERE v.colaborador_id IN ({marcadores})
+                )
+                WHERE ordem <= ?
+                ORDER BY colaborador_id, placa, data_hora DESC
+            ''', lote + [acessos_por_veiculo])
+            for colaborador_id, placa, *access in cursor.fetchall():
+                overview[colaborador_id]['accesses'].setdefault(placa, []).append(tuple(access))
+        return list(overview.values())
+
     def get_employee_by_id(self, colaborador_id):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -114,25 +173,65 @@ class VehicleAccessSystem:
         ''', (placa,))
         return cursor.fetchone()
 
-    def register_access(self, placa, permitido, observacoes=""):
+    def register_access(self, placa, permitido, observacoes="", evidencia=None):
         try:
             cursor = self.conn.cursor()
             placa = placa.replace(" ", "").replace("-", "").upper()
-            cursor.execute("SELECT id FROM veiculos WHERE placa = ?", (placa,))
-            veiculo_id = cursor.fetchone()
-            if veiculo_id:
+            cursor.execute("SELECT id, tipo_veiculo FROM veiculos WHERE placa = ?", (placa,))
+            veiculo = cursor.fetchone()
+            if veiculo:
                 data_hora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 cursor.execute('''
                     INSERT INTO acessos (veiculo_id, data_hora, acesso_permitido, observacoes)
                     VALUES (?, ?, ?, ?)
-                ''', (veiculo_id[0], data_hora, permitido, observacoes))
+                ''', (veiculo[0], data_hora, permitido, observacoes))
+                # Lido logo após o INSERT: os comandos seguintes no mesmo cursor podem alterá-lo
+                acesso_id = cursor.lastrowid
+                acumular_acesso(cursor, data_hora, placa, veiculo[1], permitido)
                 self.conn.commit()
+                # Só enfileira: a compressão e a gravação ocorrem na thread do armazém
+                if evidencia is not None and self.evidencias:
+                    self.evidencias.guardar(acesso_id, evidencia)
                 return True, f"Acesso registrado com sucesso para placa {placa}"
             else:
                 return False, f"Veículo com placa {placa} não encontrado"
         except sqlite3.Error as e:
+            self.conn.rollback()
             return False, f"Erro ao registrar acesso: {e}"
 
+    def get_access_evidence(self, acesso_id):
+        return self.evidencias.ler_imagem(acesso_id) if self.evidencias else None
+
+    def get_access_evidence_jpeg(self, acesso_id):
+        return self.evidencias.ler(acesso_id) if self.evidencias else None
+
+    def has_access_evidence(self, acesso_id):
+        return bool(self.evidencias) and self.evidencias.possui(acesso_id)
+
+    def get_access_dashboard(self, inicio, fim, granularidade='dia', limite=10):
+        return {
+            'por_periodo': acessos_por_periodo(self.conn, granularidade, inicio, fim),
+            'negacao_por_tipo': taxa_negacao_por_tipo(self.conn, inicio, fim),
+            'top_veiculos': top_veiculos(self.conn, inicio, fim, limite),
+        }
+
+    def rebuild_access_statistics(self):
+        return reconstruir_estatisticas(self.conn, self.db_path)
+
+    def archive_old_accesses(self, compactar=False):
+        return arquivar_acessos(self.conn, self.db_path, self.meses_retencao, compactar)
+
+    def get_access_report(self, inicio=None, fim=None):
+        # Só anexa os arquivos mensais que o período alcança
+        return consultar_periodo(self.conn, self.db_path, '''
+            SELECT a.id, a.data_hora, v.placa, v.modelo, v.marca, c.nome, c.cargo,
+                   CASE WHEN a.acesso_permitido THEN 'LIBERADO' ELSE 'NEGADO' END as status
+            FROM {acessos} a
+            JOIN veiculos v ON a.veiculo_id = v.id
+            LEFT JOIN colaboradores c ON v.colaborador_id = c.id
+            ORDER BY a.data_hora DESC
+        ''', inicio, fim)
+
     def add_employee(self, nome, cargo, tag_id, foto=None):
         try:
             cursor = self.conn.cursor()
@@ -199,6 +298,14 @@ class VehicleAccessSystem:
         except sqlite3.IntegrityError:
             return False, "Placa já cadastrada"
 
+    def import_employees(self, origem, formato=None, simular=False):
+        # Upsert em lote por id, ou por tag_id quando o id não vem (CSV/JSONL); retorna as contagens
+        return importar_colaboradores(self.conn, origem, formato, simular)
+
+    def import_vehicles(self, origem, formato=None, simular=False):
+        # Upsert em lote por placa (CSV/JSONL)
+        return importar_veiculos(self.conn, origem, formato, simular)
+
     def update_vehicle(self, veiculo_id, placa, modelo, marca, cor, colaborador_id, tipo_veiculo):
         if not self.validate_plate(placa):
             return False, "Placa inválida (use padrão Mercosul AAA0A00 ou antigo AAA0000)"
@@ -241,34 +348,67 @@ def preprocess_image_for_ocr(imagem):
             cropped = gray[y:y+h, x:x+w]
             # Limiar adaptativo na região recortada
             thresh = cv2.adaptiveThreshold(cropped, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-            return thresh, cropped
+            return thresh, cropped, True
     # Fallback: usar a imagem inteira se não encontrar contornos
     thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-    return thresh, gray
+    return thresh, gray, False
+
+# Cache compartilhado entre reruns e sessões do Streamlit
+@st.cache_resource
+def get_ocr_cache():
+    return CacheOCR(OCR_CACHE_CAPACIDADE, OCR_CACHE_TTL_SEGUNDOS)
+
+def recognize_plate(processed_image):
+    # Importado sob demanda: só a captura de placa usa o Tesseract
+    import pytesseract
+    if TESSERACT_CMD:
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    # Configurações do Tesseract
+    custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-'
+    text = pytesseract.image_to_string(processed_image, config=custom_config)
+    st.write(f"Texto bruto extraído: '{text}'")  # Depuração
+    text = re.sub(r'[^A-Z0-9]', '', text.upper()).strip()
+    # Validação de placa
+    if re.match(r'^[A-Z]{3}[0-9][A-Z0-9][0-9]{2}$', text) or re.match(r'^[A-Z]{3}[0-9]{4}$', text):
+        return text
+    return None
 
 # Extração de texto da placa (com depuração)
 def extract_plate_text(imagem):
     try:
         # Obter imagem pré-processada e imagem recortada para depuração
-        processed_image, debug_image = preprocess_image_for_ocr(imagem)
+        processed_image, debug_image, cropped = preprocess_image_for_ocr(imagem)
         # Exibir imagem pré-processada para depuração
         st.image(processed_image, caption="Imagem Pré-processada para OCR", use_column_width=True)
         st.image(debug_image, caption="Imagem Recortada (se aplicável)", use_column_width=True)
-        # Configurações do Tesseract
-        custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-'
-        text = pytesseract.image_to_string(processed_image, config=custom_config)
-        st.write(f"Texto bruto extraído: '{text}'")  # Depuração
-        text = re.sub(r'[^A-Z0-9]', '', text.upper()).strip()
-        # Validação de placa
-        if re.match(r'^[A-Z]{3}[0-9][A-Z0-9][0-9]{2}$', text) or re.match(r'^[A-Z]{3}[0-9]{4}$', text):
-            return text
-        return None
+        # A chave é o conteúdo exato do recorte em cinza: só a mesma foto reaproveita a leitura.
+        # Sem recorte (fallback para a imagem inteira) o cache não é usado
+        cache = get_ocr_cache()
+        if not cropped:
+            text, cached = recognize_plate(processed_image), False
+        else:
+            text, cached = cache.obter_ou_calcular(debug_image, lambda _: recognize_plate(processed_image),
+                                                   guardar_vazios=False)
+        metrics = cache.metricas()
+        st.caption(f"OCR {'em cache' if cached else 'executado'} · taxa de acerto do cache: {metrics['taxa_acerto']:.0%} "
+                   f"({metrics['acertos']}/{metrics['acertos'] + metrics['falhas']})")
+        return text, debug_image
     except Exception as e:
         st.error(f"Erro ao processar imagem: {e}")
-        return None
+        return None, None
+
+# Armazém único por processo (a thread de gravação sobrevive aos reruns)
+@st.cache_resource
+def get_evidence_store():
+    return ArmazemEvidencias(EVIDENCIAS_PASTA)
+
+# Uma instância por processo: sem isso cada rerun reabriria o banco e refaria a verificação de arquivamento
+@st.cache_resource
+def get_system():
+    return VehicleAccessSystem(evidencias=get_evidence_store())
 
 # Interface Streamlit
-system = VehicleAccessSystem()
+system = get_system()
 
 st.title("🚗 Sistema de Controle de Acesso - Carbon")
 
@@ -329,7 +469,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Menu lateral
-menu_option = st.sidebar.selectbox("Menu", ["Controle de Acesso", "Cadastros", "Relatórios"])
+menu_option = st.sidebar.selectbox("Menu", ["Controle de Acesso", "Cadastros", "Relatórios", "Painel"])
 
 if menu_option == "Controle de Acesso":
     st.header("Registro de Acesso")
@@ -342,6 +482,8 @@ if menu_option == "Controle de Acesso":
         st.session_state.employees = []
     if 'captured_plate' not in st.session_state:
         st.session_state.captured_plate = ""
+    if 'captured_crop' not in st.session_state:
+        st.session_state.captured_crop = None
 
     with st.form(key=st.session_state.form_key):
         plate_input = st.text_input("Digite a placa do veículo (ex.: ABC1D23 ou ABC1234):", value=st.session_state.captured_plate, key="plate_input").upper()
@@ -364,9 +506,10 @@ if menu_option == "Controle de Acesso":
             img_array = np.array(img)
             img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
             st.image(img_bgr, channels="BGR", caption="Imagem Capturada", use_column_width=True)
-            plate_text = extract_plate_text(img_bgr)
+            plate_text, plate_crop = extract_plate_text(img_bgr)
             if plate_text:
                 st.session_state.captured_plate = plate_text
+                st.session_state.captured_crop = plate_crop
                 st.success(f"Placa detectada: {plate_text}")
                 st.session_state.form_key = str(uuid.uuid4())
             else:
@@ -390,11 +533,19 @@ if menu_option == "Controle de Acesso":
             if name_input:
                 employees = system.get_employees_by_name(name_input)
                 if employees:
-                    st.session_state.employees = employees
+                    # Resultado memorizado por busca: os reruns dos widgets não consultam o banco de novo
+                    overview = system.get_employees_overview(employees)
+                    for item in overview:
+                        photo = item['employee'][4]
+                        item['photo_image'] = Image.open(io.BytesIO(photo)) if photo else None
+                        if item['photo_image']:
+                            item['photo_image'].load()
+                    st.session_state.employees = overview
                 else:
                     st.warning("Nenhum colaborador encontrado com este nome.")
 
     if st.session_state.vehicle_info:
+        import pandas as pd  # Importado sob demanda: só as tabelas de resultado usam
         plate, model, brand, color, v_type, name, position, tag_id, photo = st.session_state.vehicle_info
         st.success(f"🚘 Veículo encontrado: {plate}")
         col_v1, col_v2 = st.columns(2)
@@ -412,26 +563,30 @@ if menu_option == "Controle de Acesso":
             if photo:
                 st.image(Image.open(io.BytesIO(photo)), caption="Foto do Colaborador", width=150)
 
+        # O recorte capturado pela câmera acompanha o registro como evidência
+        evidence = st.session_state.captured_crop if st.session_state.captured_plate == plate else None
         col_btn1, col_btn2, _ = st.columns([1, 1, 3])
         with col_btn1:
             if st.button("✔ Liberar Acesso", key=f"approve_plate_{plate}", type="primary"):
-                success, message = system.register_access(plate, True, notes)
+                success, message = system.register_access(plate, True, notes, evidence)
                 if success:
                     st.success(message)
                     st.session_state.vehicle_info = None
                     st.session_state.employees = []
                     st.session_state.captured_plate = ""
+                    st.session_state.captured_crop = None
                     st.session_state.form_key = str(uuid.uuid4())
                 else:
                     st.error(message)
         with col_btn2:
             if st.button("✘ Reprovar Acesso", key=f"deny_plate_{plate}", type="secondary"):
-                success, message = system.register_access(plate, False, notes)
+                success, message = system.register_access(plate, False, notes, evidence)
                 if success:
                     st.success(message)
                     st.session_state.vehicle_info = None
                     st.session_state.employees = []
                     st.session_state.captured_plate = ""
+                    st.session_state.captured_crop = None
                     st.session_state.form_key = str(uuid.uuid4())
                 else:
                     st.error(message)
@@ -458,9 +613,10 @@ if menu_option == "Controle de Acesso":
                 st.info("Nenhum acesso registrado para este veículo.")
 
     if st.session_state.employees:
+        import pandas as pd
         st.subheader("Colaboradores Encontrados")
-        for emp in st.session_state.employees:
-            emp_id, emp_name, emp_position, emp_tag, emp_photo = emp
+        for item in st.session_state.employees:
+            emp_id, emp_name, emp_position, emp_tag, emp_photo = item['employee']
             st.write("---")
             col_e1, col_e2 = st.columns([3, 1])
             with col_e1:
@@ -468,10 +624,10 @@ if menu_option == "Controle de Acesso":
                 st.write(f"**Cargo:** {emp_position}")
                 st.write(f"**Tag ID:** {emp_tag}")
             with col_e2:
-                if emp_photo:
-                    st.image(Image.open(io.BytesIO(emp_photo)), caption="Foto do Colaborador", width=100)
+                if item['photo_image']:
+                    st.image(item['photo_image'], caption="Foto do Colaborador", width=100)
 
-            vehicles = system.get_vehicles_by_employee(emp_id)
+            vehicles = item['vehicles']
             if vehicles:
                 st.write("**Veículos Associados:**")
                 df_vehicles = pd.DataFrame(
@@ -485,9 +641,11 @@ if menu_option == "Controle de Acesso":
                     key=f"vehicle_select_{emp_id}"
                 )
 
-                vehicle_info = system.get_vehicle_info(selected_vehicle)
+                # Mesmos dados de get_vehicle_info, já carregados na busca
+                vehicle_info = next((v for v in vehicles if v[0] == selected_vehicle), None)
                 if vehicle_info:
-                    plate, model, brand, color, v_type, name, position, tag_id, photo = vehicle_info
+                    plate, model, brand, color, v_type = vehicle_info
+                    name, position, tag_id = emp_name, emp_position, emp_tag
                     st.success(f"🚘 Veículo selecionado: {plate}")
                     col_v1, col_v2 = st.columns(2)
                     with col_v1:
@@ -501,8 +659,8 @@ if menu_option == "Controle de Acesso":
                         st.write(f"**Nome:** {name}")
                         st.write(f"**Cargo:** {position}")
                         st.write(f"**Tag ID:** {tag_id}")
-                        if photo:
-                            st.image(Image.open(io.BytesIO(photo)), caption="Foto do Colaborador", width=150)
+                        if item['photo_image']:
+                            st.image(item['photo_image'], caption="Foto do Colaborador", width=150)
 
                 col_btn1, col_btn2, _ = st.columns([1, 1, 3])
                 with col_btn1:
@@ -513,6 +671,7 @@ if menu_option == "Controle de Acesso":
                             st.session_state.vehicle_info = None
                             st.session_state.employees = []
                             st.session_state.captured_plate = ""
+                            st.session_state.captured_crop = None
                             st.session_state.form_key = str(uuid.uuid4())
                         else:
                             st.error(message)
@@ -524,20 +683,13 @@ if menu_option == "Controle de Acesso":
                             st.session_state.vehicle_info = None
                             st.session_state.employees = []
                             st.session_state.captured_plate = ""
+                            st.session_state.captured_crop = None
                             st.session_state.form_key = str(uuid.uuid4())
                         else:
                             st.error(message)
 
                 with st.expander("Ver últimos acessos"):
-                    cursor = system.conn.cursor()
-                    cursor.execute('''
-                        SELECT data_hora, acesso_permitido, observacoes
-                        FROM acessos a
-                        JOIN veiculos v ON a.veiculo_id = v.id
-                        WHERE v.placa = ?
-                        ORDER BY a.data_hora DESC LIMIT 5
-                    ''', (selected_vehicle,))
-                    accesses = cursor.fetchall()
+                    accesses = item['accesses'].get(selected_vehicle, [])
                     if accesses:
                         df = pd.DataFrame(
                             accesses,
@@ -553,7 +705,7 @@ if menu_option == "Controle de Acesso":
 
 elif menu_option == "Cadastros":
     st.header("Cadastros")
-    tab1, tab2, tab3 = st.tabs(["Cadastrar/Editar Colaborador", "Cadastrar/Editar Veículo", "Atualizar Foto do Colaborador"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Cadastrar/Editar Colaborador", "Cadastrar/Editar Veículo", "Atualizar Foto do Colaborador", "Importação em Lote"])
 
     with tab1:
         st.subheader("Pesquisar e Editar Colaborador")
@@ -716,33 +868,93 @@ elif menu_option == "Cadastros":
             else:
                 st.warning("Digite um nome para buscar.")
 
+    with tab4:
+        st.subheader("Importação em Lote")
+        st.caption("Colaboradores: nome, cargo, tag_id [, id, ativo] · Veículos: placa, modelo, marca, cor, tipo_veiculo, colaborador_id ou colaborador_tag")
+        import_type = st.radio("Tipo de cadastro", ["Colaboradores", "Veículos"], horizontal=True, key="import_type")
+        import_file = st.file_uploader("Arquivo CSV ou JSONL", type=["csv", "jsonl", "json"], key="import_file")
+        dry_run = st.checkbox("Apenas validar (não gravar)", key="import_dry_run")
+        if st.button("Importar", key="import_button"):
+            if import_file:
+                try:
+                    if import_type == "Colaboradores":
+                        summary = system.import_employees(import_file, simular=dry_run)
+                    else:
+                        summary = system.import_vehicles(import_file, simular=dry_run)
+                    st.success(f"Inseridos: {summary['inseridos']} · Atualizados: {summary['atualizados']} · Rejeitados: {summary['rejeitados']}")
+                    if summary['erros']:
+                        st.dataframe([{"Registro": registro, "Motivo": motivo} for registro, motivo in summary['erros']])
+                except (ValueError, sqlite3.Error) as e:
+                    st.error(f"Erro na importação: {e}")
+            else:
+                st.warning("Selecione um arquivo para importar.")
+
 elif menu_option == "Relatórios":
+    import pandas as pd
     st.header("Relatórios de Acesso")
     date_range = st.date_input("Selecione o período", [])
     if st.button("Gerar Relatório"):
-        cursor = system.conn.cursor()
-        query = '''
-            SELECT a.data_hora, v.placa, v.modelo, v.marca, c.nome, c.cargo,
-                   CASE WHEN a.acesso_permitido THEN 'LIBERADO' ELSE 'NEGADO' END as status
-            FROM acessos a
-            JOIN veiculos v ON a.veiculo_id = v.id
-            LEFT JOIN colaboradores c ON v.colaborador_id = c.id
-            ORDER BY a.data_hora DESC
-        '''
-        cursor.execute(query)
-        data = cursor.fetchall()
-        if data:
-            df = pd.DataFrame(data, columns=["Data/Hora", "Placa", "Modelo", "Marca", "Proprietário", "Cargo", "Status"])
-            st.dataframe(df)
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                "Baixar como CSV",
-                data=csv,
-                file_name="relatorio_acessos.csv",
-                mime="text/csv"
-            )
+        report_start = date_range[0] if len(date_range) > 0 else None
+        report_end = date_range[1] if len(date_range) > 1 else report_start
+        # Guardado na sessão para o relatório continuar visível ao escolher uma evidência
+        st.session_state.report_data = system.get_access_report(report_start, report_end)
+    data = st.session_state.get('report_data')
+    if data:
+        df = pd.DataFrame(data, columns=["ID", "Data/Hora", "Placa", "Modelo", "Marca", "Proprietário", "Cargo", "Status"])
+        st.dataframe(df)
+        csv = df.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            "Baixar como CSV",
+            data=csv,
+            file_name="relatorio_acessos.csv",
+            mime="text/csv"
+        )
+
+        # Recorte da placa gravado no momento do acesso
+        st.subheader("Evidência do Acesso")
+        with_evidence = [row for row in data if system.has_access_evidence(row[0])]
+        if with_evidence:
+            selected = st.selectbox("Acesso", with_evidence,
+                                    format_func=lambda row: f"#{row[0]} · {row[1]} · {row[2]} · {row[7]}")
+            evidence = system.get_access_evidence(selected[0])
+            if evidence is not None:
+                st.image(evidence, channels="BGR", caption=f"Acesso #{selected[0]} - {selected[2]}")
+                st.download_button(
+                    "Baixar evidência",
+                    data=bytes(system.get_access_evidence_jpeg(selected[0])),
+                    file_name=f"evidencia_{selected[0]}.jpg",
+                    mime="image/jpeg"
+                )
         else:
-            st.info("Nenhum registro de acesso encontrado")
-
-
-
+            st.info("Nenhum acesso do período tem evidência gravada")
+    elif data is not None:
+        st.info("Nenhum registro de acesso encontrado")
+
+elif menu_option == "Painel":
+    import pandas as pd
+    st.header("Painel de Acessos")
+    inicio_padrao, fim_padrao = periodo_padrao()
+    col_p1, col_p2 = st.columns([2, 1])
+    with col_p1:
+        dashboard_range = st.date_input("Período", [datetime.strptime(inicio_padrao, "%Y-%m-%d").date(),
+                                                    datetime.strptime(fim_padrao, "%Y-%m-%d").date()])
+    with col_p2:
+        granularity = st.selectbox("Agrupar por", ["dia", "hora"])
+    if len(dashboard_range) == 2:
+        dashboard = system.get_access_dashboard(dashboard_range[0], dashboard_range[1], granularity)
+        if dashboard['por_periodo']:
+            df_periodo = pd.DataFrame(dashboard['por_periodo'], columns=["Período", "Liberados", "Negados"]).set_index("Período")
+            st.subheader("Acessos por período")
+            st.bar_chart(df_periodo)
+            col_d1, col_d2 = st.columns(2)
+            with col_d1:
+                st.subheader("Taxa de negação por tipo")
+                st.dataframe(pd.DataFrame(dashboard['negacao_por_tipo'], columns=["Tipo", "Total", "Negados", "Taxa (%)"]))
+            with col_d2:
+                st.subheader("Veículos mais frequentes")
+                st.dataframe(pd.DataFrame(dashboard['top_veiculos'], columns=["Placa", "Tipo", "Total", "Negados"]))
+        else:
+            st.info("Nenhum acesso registrado no período")
+    if st.button("Recalcular estatísticas"):
+        total = system.rebuild_access_statistics()
+        st.success(f"Estatísticas recalculadas ({total} acessos)")
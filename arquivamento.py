@@ -0,0 +1,179 @@
+# Arquivamento mensal do histórico de acessos em bancos anexos
+# Uso: python arquivamento.py carbon_access.db [meses_retencao]
+#      python arquivamento.py placas_liberadas.db 6
+import os
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+MESES_RETENCAO_PADRAO = 12
+# SQLite permite no máximo 10 bancos anexados por conexão (SQLITE_MAX_ATTACHED)
+MAX_ARQUIVOS_POR_CONSULTA = 8
+
+
+def tabela_historico(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")
+    tabelas = {linha[0] for linha in cursor.fetchall()}
+    for tabela in ('acessos', 'historico_acessos'):
+        if tabela in tabelas:
+            return tabela
+    raise ValueError("Banco sem tabela de acessos conhecida")
+
+
+def pasta_arquivo(caminho_banco):
+    base = os.path.splitext(os.path.abspath(caminho_banco))[0]
+    return f"{base}_arquivo"
+
+
+def caminho_arquivo(caminho_banco, mes):
+    return os.path.join(pasta_arquivo(caminho_banco), f"{mes.replace('-', '_')}.db")
+
+
+def meses_arquivados(caminho_banco):
+    pasta = pasta_arquivo(caminho_banco)
+    if not os.path.isdir(pasta):
+        return []
+    meses = []
+    for nome in os.listdir(pasta):
+        encontrado = re.match(r'^(\d{4})_(\d{2})\.db$', nome)
+        if encontrado:
+            meses.append(f"{encontrado.group(1)}-{encontrado.group(2)}")
+    return sorted(meses)
+
+
+def mes_limite(meses_retencao, agora=None):
+    # Primeiro mês mantido no banco principal ('YYYY-MM')
+    agora = agora or datetime.now()
+    total = agora.year * 12 + agora.month - 1 - meses_retencao
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def _proximo_mes(mes):
+    ano, numero = int(mes[:4]), int(mes[5:7])
+    return f"{ano + numero // 12:04d}-{numero % 12 + 1:02d}"
+
+
+def _criar_tabela_arquivo(cursor, esquema, tabela):
+    # Mesmas colunas da tabela viva, sem as FKs (as tabelas referenciadas ficam no banco principal)
+    cursor.execute(f"PRAGMA main.table_info({tabela})")
+    colunas = []
+    for _, nome, tipo, _, _, pk in cursor.fetchall():
+        colunas.append(f"{nome} INTEGER PRIMARY KEY" if pk else f"{nome} {tipo}")
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {esquema}.{tabela} ({', '.join(colunas)})")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {esquema}.idx_{tabela}_data_hora ON {tabela} (data_hora)")
+
+
+def precisa_arquivar(conn, meses_retencao=MESES_RETENCAO_PADRAO):
+    # Consulta barata (usa o índice em data_hora) para rodar a cada inicialização
+    tabela = tabela_historico(conn)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN(data_hora) FROM main.{tabela}")
+    mais_antigo = cursor.fetchone()[0]
+    return bool(mais_antigo) and mais_antigo[:7] < mes_limite(meses_retencao)
+
+
+def arquivar_acessos(conn, caminho_banco, meses_retencao=MESES_RETENCAO_PADRAO, compactar=False):
+    tabela = tabela_historico(conn)
+    limite = mes_limite(meses_retencao)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT DISTINCT substr(data_hora, 1, 7) FROM main.{tabela}
+        WHERE data_hora < ?
+    ''', (f"{limite}-01",))
+    meses = [linha[0] for linha in cursor.fetchall()]
+    if not meses:
+        return {}
+
+    os.makedirs(pasta_arquivo(caminho_banco), exist_ok=True)
+    conn.commit()  # ATTACH não pode rodar dentro de transação
+    movidos = {}
+    for mes in meses:
+        cursor.execute("ATTACH DATABASE ? AS arquivo_mes", (caminho_arquivo(caminho_banco, mes),))
+        try:
+            _criar_tabela_arquivo(cursor, 'arquivo_mes', tabela)
+            intervalo = (f"{mes}-01", f"{_proximo_mes(mes)}-01")
+            # Cópia e remoção na mesma transação: uma falha não perde nem duplica linhas
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO arquivo_mes.{tabela}
+                SELECT * FROM main.{tabela} WHERE data_hora >= ? AND data_hora < ?
+            ''', intervalo)
+            cursor.execute(f"DELETE FROM main.{tabela} WHERE data_hora >= ? AND data_hora < ?", intervalo)
+            movidos[mes] = cursor.rowcount
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("DETACH DATABASE arquivo_mes")
+
+    if compactar:
+        conn.execute("VACUUM")
+    return movidos
+
+
+@contextmanager
+def _arquivos_anexados(conn, caminho_banco, meses):
+    cursor = conn.cursor()
+    esquemas = []
+    try:
+        for mes in meses:
+            esquema = f"arquivo_{mes.replace('-', '_')}"
+            cursor.execute(f"ATTACH DATABASE ? AS {esquema}", (caminho_arquivo(caminho_banco, mes),))
+            esquemas.append(esquema)
+        yield esquemas
+    finally:
+        for esquema in esquemas:
+            cursor.execute(f"DETACH DATABASE {esquema}")
+
+
+def consultar_periodo(conn, caminho_banco, consulta, inicio=None, fim=None, parametros=()):
+    # 'consulta' usa o marcador {acessos} no lugar da tabela de histórico, deve
+    # ordenar por data_hora DESC e só pode ter parâmetros depois do FROM.
+    # Os arquivos só são anexados quando o período os alcança. Cada lote cobre um
+    # intervalo de datas próprio, anterior ao do lote anterior, e lê desse intervalo
+    # tanto os arquivos quanto a tabela viva (que pode ter linhas antigas reprocessadas),
+    # então concatenar os lotes preserva a ordenação e um grupo por hora/dia/mês
+    # nunca se divide entre lotes.
+    tabela = tabela_historico(conn)
+    inicio = str(inicio)[:10] if inicio else ''
+    fim = str(fim)[:10] if fim else '9999-12-31'
+    meses = [mes for mes in meses_arquivados(caminho_banco) if inicio[:7] <= mes <= fim[:7]]
+    meses.sort(reverse=True)
+    # Lote vazio = apenas a tabela viva, sem anexar nada
+    lotes = [meses[posicao:posicao + MAX_ARQUIVOS_POR_CONSULTA]
+             for posicao in range(0, len(meses), MAX_ARQUIVOS_POR_CONSULTA)] or [[]]
+    if meses and conn.in_transaction:
+        # ATTACH não pode rodar dentro de transação, e confirmar a do chamador aqui não cabe
+        raise ValueError("Confirme ou desfaça a transação aberta antes de consultar meses arquivados")
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN(data_hora) FROM main.{tabela}")
+    mais_antigo_vivo = cursor.fetchone()[0]
+    resultados = []
+    superior = f"{fim}~"  # '~' ordena depois de qualquer hora do último dia
+    for posicao, lote in enumerate(lotes):
+        inferior = f"{lote[-1]}-01" if posicao < len(lotes) - 1 else inicio
+        with _arquivos_anexados(conn, caminho_banco, lote) as esquemas:
+            fontes = (['main'] if mais_antigo_vivo is not None and mais_antigo_vivo < superior else []) + esquemas
+            if fontes:
+                uniao = ' UNION ALL '.join(
+                    f"SELECT * FROM {esquema}.{tabela} WHERE data_hora >= ? AND data_hora < ?" for esquema in fontes
+                )
+                limites = (max(inicio, inferior), superior)
+                cursor.execute(consulta.format(acessos=f"({uniao})"), limites * len(fontes) + tuple(parametros))
+                resultados.extend(cursor.fetchall())
+        superior = inferior
+    return resultados
+
+
+if __name__ == "__main__":
+    banco = sys.argv[1] if len(sys.argv) > 1 else 'carbon_access.db'
+    meses_retencao = int(sys.argv[2]) if len(sys.argv) > 2 else MESES_RETENCAO_PADRAO
+    conn = sqlite3.connect(banco)
+    movidos = arquivar_acessos(conn, banco, meses_retencao, compactar=True)
+    for mes, total in movidos.items():
+        print(f"{mes}: {total} acessos movidos para {caminho_arquivo(banco, mes)}")
+    print(f"Arquivamento concluído ({sum(movidos.values())} acessos)")
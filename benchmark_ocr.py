@@ -0,0 +1,109 @@
+# Comparação de precisão e velocidade entre o EasyOCR original e o backend ONNX int8,
+# precedida do perfil de importação e do tempo de partida a frio
+# Uso: python benchmark_ocr.py [pasta_imagens] [pasta_modelos_onnx] [threads]
+# O nome de cada imagem deve começar pela placa esperada (ex.: ABC1D23.jpg, ABC1D23_noite.png)
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from placa_reader import PlacaReaderApp
+
+EXTENSOES = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def carregar_conjunto(pasta):
+    conjunto = []
+    for nome in sorted(os.listdir(pasta)):
+        if not nome.lower().endswith(EXTENSOES):
+            continue
+        esperado = re.match(r'^([A-Za-z0-9]{7})', nome)
+        if esperado:
+            conjunto.append((os.path.join(pasta, nome), esperado.group(1).upper()))
+    return conjunto
+
+
+def perfil_importacao(modulo='placa_reader', quantidade=10):
+    # Roda em um processo novo para medir a importação a frio (python -X importtime)
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                              capture_output=True, text=True)
+    # O importtime lista os filhos antes do pai, com dois espaços de recuo por nível: os
+    # imports diretos do módulo são as linhas de um nível acumuladas até a linha dele
+    modulos, filhos = [], []
+    for linha in processo.stderr.splitlines():
+        encontrado = re.match(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$', linha)
+        if not encontrado:
+            continue
+        nivel = len(encontrado.group(3)) // 2
+        if nivel == 1:
+            filhos.append((int(encontrado.group(2)) / 1000, encontrado.group(4)))
+        elif nivel == 0:
+            if encontrado.group(4) == modulo:
+                modulos = filhos
+            filhos = []
+    modulos.sort(reverse=True)
+    return modulos[:quantidade]
+
+
+def medir_partida(motor, pasta_modelos, threads):
+    # Tempo até a primeira consulta ao banco e até o modelo de OCR ficar pronto
+    inicio = time.perf_counter()
+    app = PlacaReaderApp(':memory:', motor_ocr=motor, pasta_modelos_onnx=pasta_modelos, threads_onnx=threads)
+    app.verificar_placa('ABC1D23')
+    primeira_consulta = time.perf_counter() - inicio
+    app.aguardar_leitor()
+    return primeira_consulta, time.perf_counter() - inicio, app.estado_leitor()
+
+
+def medir_motor(motor, conjunto, pasta_modelos, threads):
+    inicio = time.perf_counter()
+    # Banco em memória e cache desligado: mede só o OCR
+    app = PlacaReaderApp(':memory:', cache_capacidade=0, motor_ocr=motor,
+                         pasta_modelos_onnx=pasta_modelos, threads_onnx=threads,
+                         carregar_em_segundo_plano=False)
+    carga = time.perf_counter() - inicio
+    tempos, acertos = [], 0
+    for caminho, esperado in conjunto:
+        inicio = time.perf_counter()
+        placa = app.ler_placa(caminho)
+        tempos.append(time.perf_counter() - inicio)
+        acertos += placa == esperado
+    tempos.sort()
+    return {
+        'motor': motor,
+        'carga_s': carga,
+        'precisao': acertos / len(conjunto),
+        'media_ms': statistics.mean(tempos) * 1000,
+        'p95_ms': tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))] * 1000,
+    }
+
+
+def main():
+    pasta_modelos = sys.argv[2] if len(sys.argv) > 2 else 'modelos_onnx'
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    print("Importação de placa_reader (ms acumulados por import direto):")
+    for milissegundos, modulo in perfil_importacao():
+        print(f"  {modulo:<30}{milissegundos:>10.1f}")
+    for motor in ('easyocr', 'onnx'):
+        primeira_consulta, pronto, estado = medir_partida(motor, pasta_modelos, threads)
+        print(f"Partida {motor}: primeira consulta em {primeira_consulta:.2f}s, OCR {estado} em {pronto:.2f}s")
+
+    if len(sys.argv) < 2:
+        return
+    conjunto = carregar_conjunto(sys.argv[1])
+    if not conjunto:
+        print("Nenhuma imagem com placa no nome encontrada")
+        sys.exit(1)
+
+    print(f"{len(conjunto)} imagens, ONNX com {threads} thread(s)")
+    print(f"{'motor':<10}{'carga (s)':>12}{'precisão':>12}{'média (ms)':>14}{'p95 (ms)':>12}")
+    for motor in ('easyocr', 'onnx'):
+        r = medir_motor(motor, conjunto, pasta_modelos, threads)
+        print(f"{r['motor']:<10}{r['carga_s']:>12.2f}{r['precisao']:>12.1%}{r['media_ms']:>14.1f}{r['p95_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Cache de resultados do OCR indexado pelo conteúdo exato do recorte pré-processado.
+# Cobre reruns do Streamlit e quadros repetidos (mesmos bytes). Não há busca por
+# semelhança (dHash/Hamming): placas que diferem em um caractere ficam mais próximas
+# que dois quadros ruidosos do mesmo carro, e o cache devolveria a placa errada.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_AUSENTE = object()
+
+
+def chave_imagem(imagem):
+    # Só imagens idênticas (mesmas dimensões e pixels) têm a mesma chave
+    digest = hashlib.blake2b(str(imagem.shape).encode(), digest_size=16)
+    digest.update(np.ascontiguousarray(imagem).tobytes())
+    return digest.digest()
+
+
+class CacheOCR:
+    def __init__(self, capacidade=256, ttl=300):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # chave -> (instante, resultado), do menos ao mais recentemente usado
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def _remover_expirados(self, agora):
+        # A ordem do OrderedDict é por uso (LRU), não por idade, então verifica todas
+        expirados = [chave for chave, (instante, _) in self._entradas.items() if agora - instante > self.ttl]
+        for chave in expirados:
+            del self._entradas[chave]
+
+    def buscar(self, chave):
+        agora = time.monotonic()
+        with self._lock:
+            self._remover_expirados(agora)
+            if chave not in self._entradas:
+                self.falhas += 1
+                return _AUSENTE
+            self.acertos += 1
+            self._entradas.move_to_end(chave)
+            return self._entradas[chave][1]
+
+    def guardar(self, chave, resultado):
+        with self._lock:
+            self._entradas[chave] = (time.monotonic(), resultado)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+    def obter_ou_calcular(self, imagem, reconhecer, guardar_vazios=True):
+        # Retorna (resultado, veio_do_cache). Com guardar_vazios=False uma leitura None não é
+        # guardada: o próximo quadro tenta de novo em vez de repetir a falha por ttl segundos
+        chave = chave_imagem(imagem)
+        resultado = self.buscar(chave)
+        if resultado is not _AUSENTE:
+            return resultado, True
+        resultado = reconhecer(imagem)
+        if resultado is not None or guardar_vazios:
+            self.guardar(chave, resultado)
+        return resultado, False
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def metricas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / total, 3) if total else 0.0,
+                'entradas': len(self._entradas),
+            }
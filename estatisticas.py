@@ -0,0 +1,192 @@
+# Estatísticas pré-agregadas de acesso (rollups por hora e por dia)
+# Uso: python estatisticas.py carbon_access.db        -> reconstrói as tabelas a partir do histórico
+#      python estatisticas.py placas_liberadas.db
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from arquivamento import consultar_periodo
+
+# Granularidade -> (tabela, tamanho do prefixo de 'YYYY-MM-DD HH:MM:SS' usado como período).
+# Agregadas só por tipo de veículo e resultado: poucas linhas por período, qualquer que seja o histórico
+GRANULARIDADES = {
+    'hora': ('estatisticas_acessos_hora', 13),
+    'dia': ('estatisticas_acessos_dia', 10),
+}
+# Contagem diária por placa, usada apenas no ranking de veículos
+TABELA_PLACAS = 'estatisticas_placas_dia'
+
+
+def _rollups():
+    # (tabela, tamanho do período, colunas da chave além do período)
+    for tabela, tamanho in GRANULARIDADES.values():
+        yield tabela, tamanho, ('tipo_veiculo', 'permitido')
+    yield TABELA_PLACAS, 10, ('placa', 'tipo_veiculo', 'permitido')
+
+
+def _criar_tabela(cursor, tabela, chaves):
+    colunas = ''.join(f"{coluna} {'INTEGER' if coluna == 'permitido' else 'TEXT'} NOT NULL, " for coluna in chaves)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {tabela} (
+            periodo TEXT NOT NULL, {colunas}
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (periodo, {', '.join(chaves)})
+        ) WITHOUT ROWID
+    ''')
+
+
+def criar_tabelas_estatisticas(conn):
+    # Retorna True se as tabelas acabaram de ser criadas (precisam de backfill)
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (GRANULARIDADES['dia'][0],))
+    criadas = cursor.fetchone() is None
+    for tabela, _, chaves in _rollups():
+        _criar_tabela(cursor, tabela, chaves)
+    conn.commit()
+    return criadas
+
+
+def acumular_acesso(cursor, data_hora, placa, tipo_veiculo, permitido, quantidade=1):
+    # Não faz commit: deve rodar na mesma transação do INSERT do acesso
+    valores = {'placa': placa or '', 'tipo_veiculo': tipo_veiculo or '', 'permitido': int(bool(permitido))}
+    for tabela, tamanho, chaves in _rollups():
+        if 'placa' in chaves and not placa:
+            continue
+        colunas = ', '.join(chaves)
+        cursor.execute(f'''
+            INSERT INTO {tabela} (periodo, {colunas}, total)
+            VALUES (?, {', '.join('?' * len(chaves))}, ?)
+            ON CONFLICT (periodo, {colunas})
+            DO UPDATE SET total = total + excluded.total
+        ''', (data_hora[:tamanho], *(valores[coluna] for coluna in chaves), quantidade))
+
+
+def _consulta_origem(conn):
+    # Cada banco tem seu próprio esquema de histórico; {acessos} é preenchido por consultar_periodo
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tabelas = {linha[0] for linha in cursor.fetchall()}
+    if 'acessos' in tabelas:
+        return '''
+            SELECT a.data_hora AS data_hora, COALESCE(v.placa, '') AS placa,
+                   COALESCE(v.tipo_veiculo, '') AS tipo_veiculo, a.acesso_permitido AS permitido
+            FROM {acessos} a
+            LEFT JOIN veiculos v ON a.veiculo_id = v.id
+        '''
+    if 'historico_acessos' in tabelas:
+        return '''
+            SELECT data_hora, COALESCE(placa, '') AS placa, '' AS tipo_veiculo, liberado AS permitido
+            FROM {acessos}
+        '''
+    raise ValueError("Banco sem tabela de acessos conhecida")
+
+
+def reconstruir_estatisticas(conn, caminho_banco):
+    # Backfill: recalcula os rollups a partir do histórico completo, banco principal e
+    # arquivos mensais (ver arquivamento.py). Linhas antigas inseridas depois do
+    # arquivamento (reprocessamento de gravações) somam com as já arquivadas.
+    criar_tabelas_estatisticas(conn)
+    origem = _consulta_origem(conn)
+    por_hora = consultar_periodo(conn, caminho_banco, f'''
+        SELECT substr(data_hora, 1, 13), tipo_veiculo, permitido, COUNT(*)
+        FROM ({origem}) AS origem
+        WHERE data_hora IS NOT NULL
+        GROUP BY 1, 2, 3
+    ''')
+    por_placa = consultar_periodo(conn, caminho_banco, f'''
+        SELECT substr(data_hora, 1, 10), placa, tipo_veiculo, permitido, COUNT(*)
+        FROM ({origem}) AS origem
+        WHERE data_hora IS NOT NULL AND placa <> ''
+        GROUP BY 1, 2, 3, 4
+    ''')
+
+    # Cada fonte (banco principal, lotes de arquivos) agrega separadamente; soma aqui
+    totais = {tabela: {} for tabela, _, _ in _rollups()}
+    for periodo, tipo_veiculo, permitido, total in por_hora:
+        for tabela, tamanho in GRANULARIDADES.values():
+            chave = (periodo[:tamanho], tipo_veiculo, int(bool(permitido)))
+            totais[tabela][chave] = totais[tabela].get(chave, 0) + total
+    for periodo, placa, tipo_veiculo, permitido, total in por_placa:
+        chave = (periodo, placa, tipo_veiculo, int(bool(permitido)))
+        totais[TABELA_PLACAS][chave] = totais[TABELA_PLACAS].get(chave, 0) + total
+
+    cursor = conn.cursor()
+    try:
+        for tabela, _, chaves in _rollups():
+            cursor.execute(f"DELETE FROM {tabela}")
+            cursor.executemany(f'''
+                INSERT INTO {tabela} (periodo, {', '.join(chaves)}, total)
+                VALUES (?, {', '.join('?' * len(chaves))}, ?)
+            ''', [(*chave, total) for chave, total in totais[tabela].items()])
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return sum(totais[GRANULARIDADES['dia'][0]].values())
+
+
+def _intervalo(granularidade, inicio, fim):
+    # Datas (date/datetime/str) -> limites de período comparáveis como texto.
+    # '~' ordena depois de qualquer hora: fim=date(2026, 10, 19) inclui '2026-10-19 23'
+    tabela, tamanho = GRANULARIDADES[granularidade]
+    inicio = str(inicio)[:tamanho] if inicio else ''
+    fim = f"{str(fim)[:tamanho]}~" if fim else '9999'
+    return tabela, inicio, fim
+
+
+def acessos_por_periodo(conn, granularidade='dia', inicio=None, fim=None):
+    tabela, inicio, fim = _intervalo(granularidade, inicio, fim)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT periodo,
+               SUM(CASE WHEN permitido THEN total ELSE 0 END) AS liberados,
+               SUM(CASE WHEN permitido THEN 0 ELSE total END) AS negados
+        FROM {tabela}
+        WHERE periodo BETWEEN ? AND ?
+        GROUP BY periodo
+        ORDER BY periodo
+    ''', (inicio, fim))
+    return cursor.fetchall()
+
+
+def taxa_negacao_por_tipo(conn, inicio=None, fim=None):
+    tabela, inicio, fim = _intervalo('dia', inicio, fim)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT tipo_veiculo,
+               SUM(total) AS total,
+               SUM(CASE WHEN permitido THEN 0 ELSE total END) AS negados,
+               ROUND(100.0 * SUM(CASE WHEN permitido THEN 0 ELSE total END) / SUM(total), 1) AS taxa
+        FROM {tabela}
+        WHERE periodo BETWEEN ? AND ?
+        GROUP BY tipo_veiculo
+        ORDER BY taxa DESC
+    ''', (inicio, fim))
+    return cursor.fetchall()
+
+
+def top_veiculos(conn, inicio=None, fim=None, limite=10):
+    _, inicio, fim = _intervalo('dia', inicio, fim)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT placa, tipo_veiculo, SUM(total) AS total,
+               SUM(CASE WHEN permitido THEN 0 ELSE total END) AS negados
+        FROM {TABELA_PLACAS}
+        WHERE periodo BETWEEN ? AND ?
+        GROUP BY placa, tipo_veiculo
+        ORDER BY total DESC
+        LIMIT ?
+    ''', (inicio, fim, limite))
+    return cursor.fetchall()
+
+
+def periodo_padrao(dias=30):
+    fim = datetime.now()
+    return (fim - timedelta(days=dias)).strftime("%Y-%m-%d"), fim.strftime("%Y-%m-%d")
+
+
+if __name__ == "__main__":
+    banco = sys.argv[1] if len(sys.argv) > 1 else 'carbon_access.db'
+    conn = sqlite3.connect(banco)
+    total = reconstruir_estatisticas(conn, banco)
+    print(f"Estatísticas reconstruídas em {banco}: {total} acessos agregados")
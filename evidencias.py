@@ -0,0 +1,179 @@
+# Armazém append-only de evidências (recortes da placa) por acesso
+# Segmentos:  segmento_000001.dat ... registros [cabeçalho EVD1 | id_acesso | tamanho][JPEG]
+# Índice:     indice.dat com registros fixos (id_acesso, segmento, offset, tamanho)
+# As gravações rodam em uma thread própria; registrar o acesso só enfileira a imagem.
+# Uso: python evidencias.py placas_liberadas_evidencias 42 [saida.jpg]   -> exporta a evidência do acesso 42
+import atexit
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+CABECALHO = struct.Struct('<4sQI')  # marcador, id do acesso, tamanho da imagem
+MARCADOR = b'EVD1'
+REGISTRO_INDICE = struct.Struct('<QIQI')  # id do acesso, segmento, offset da imagem, tamanho
+ARQUIVO_INDICE = 'indice.dat'
+
+
+class ArmazemEvidencias:
+    def __init__(self, pasta, tamanho_segmento=64 * 1024 * 1024, largura_maxima=320, qualidade=70,
+                 tamanho_fila=256):
+        self.pasta = pasta
+        self.tamanho_segmento = tamanho_segmento
+        self.largura_maxima = largura_maxima
+        self.qualidade = qualidade
+        os.makedirs(pasta, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._indice = {}
+        self._mapas = {}  # segmento -> mmap somente leitura
+        self._carregar_indice()
+        self._segmento = max((int(nome[9:15]) for nome in os.listdir(pasta)
+                              if nome.startswith('segmento_') and nome.endswith('.dat')), default=1)
+        self._arquivo_segmento = open(self._caminho_segmento(self._segmento), 'ab')
+        self._arquivo_indice = open(os.path.join(pasta, ARQUIVO_INDICE), 'ab')
+
+        self.descartadas = 0
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._gravador = threading.Thread(target=self._gravar_continuamente, name='gravador-evidencias', daemon=True)
+        self._gravador.start()
+        atexit.register(self.fechar)
+
+    def _caminho_segmento(self, segmento):
+        return os.path.join(self.pasta, f"segmento_{segmento:06d}.dat")
+
+    def _carregar_indice(self):
+        caminho = os.path.join(self.pasta, ARQUIVO_INDICE)
+        if not os.path.exists(caminho):
+            return
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+        # Um registro incompleto no fim (queda durante a gravação) é ignorado
+        for posicao in range(0, len(dados) - REGISTRO_INDICE.size + 1, REGISTRO_INDICE.size):
+            id_acesso, segmento, offset, tamanho = REGISTRO_INDICE.unpack_from(dados, posicao)
+            self._indice[id_acesso] = (segmento, offset, tamanho)
+
+    def guardar(self, id_acesso, imagem):
+        # Chamado no caminho crítico: só enfileira, nunca bloqueia
+        if imagem is None or id_acesso is None:
+            return False
+        try:
+            self._fila.put_nowait((id_acesso, imagem.copy()))
+            return True
+        except queue.Full:
+            self.descartadas += 1
+            return False
+
+    def _comprimir(self, imagem):
+        altura, largura = imagem.shape[:2]
+        if largura > self.largura_maxima:
+            escala = self.largura_maxima / largura
+            imagem = cv2.resize(imagem, (self.largura_maxima, max(1, int(altura * escala))), interpolation=cv2.INTER_AREA)
+        ok, dados = cv2.imencode('.jpg', imagem, [cv2.IMWRITE_JPEG_QUALITY, self.qualidade])
+        return dados.tobytes() if ok else None
+
+    def _gravar_continuamente(self):
+        while True:
+            item = self._fila.get()
+            try:
+                if item is None:
+                    return
+                id_acesso, imagem = item
+                dados = self._comprimir(imagem)
+                if dados:
+                    self._anexar(id_acesso, dados)
+            finally:
+                self._fila.task_done()
+
+    def _anexar(self, id_acesso, dados):
+        # Rotação por tamanho: cada segmento fechado nunca mais é alterado
+        if self._arquivo_segmento.tell() + CABECALHO.size + len(dados) > self.tamanho_segmento \
+                and self._arquivo_segmento.tell() > 0:
+            self._arquivo_segmento.close()
+            self._segmento += 1
+            self._arquivo_segmento = open(self._caminho_segmento(self._segmento), 'ab')
+        offset = self._arquivo_segmento.tell() + CABECALHO.size
+        self._arquivo_segmento.write(CABECALHO.pack(MARCADOR, id_acesso, len(dados)) + dados)
+        self._arquivo_segmento.flush()
+        # O índice só é gravado depois da imagem, então nunca aponta para dados ausentes
+        self._arquivo_indice.write(REGISTRO_INDICE.pack(id_acesso, self._segmento, offset, len(dados)))
+        self._arquivo_indice.flush()
+        with self._lock:
+            self._indice[id_acesso] = (self._segmento, offset, len(dados))
+
+    def _mapa(self, segmento, fim):
+        # Remapeia se o segmento cresceu desde o último mapeamento (segmento ativo)
+        mapa = self._mapas.get(segmento)
+        if mapa is None or len(mapa) < fim:
+            if mapa is not None:
+                mapa.close()
+            with open(self._caminho_segmento(segmento), 'rb') as arquivo:
+                mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapas[segmento] = mapa
+        return mapa
+
+    def ler(self, id_acesso):
+        # Bytes JPEG da evidência, ou None se o acesso não tem imagem
+        with self._lock:
+            entrada = self._indice.get(id_acesso)
+            if entrada is None:
+                return None
+            segmento, offset, tamanho = entrada
+            return self._mapa(segmento, offset + tamanho)[offset:offset + tamanho]
+
+    def ler_imagem(self, id_acesso):
+        dados = self.ler(id_acesso)
+        if dados is None:
+            return None
+        return cv2.imdecode(np.frombuffer(dados, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+    def possui(self, id_acesso):
+        with self._lock:
+            return id_acesso in self._indice
+
+    def aguardar_gravacoes(self):
+        self._fila.join()
+
+    def fechar(self):
+        if not self._gravador.is_alive():
+            return
+        self._fila.put(None)
+        self._gravador.join()
+        self._arquivo_segmento.close()
+        self._arquivo_indice.close()
+        with self._lock:
+            for mapa in self._mapas.values():
+                mapa.close()
+            self._mapas.clear()
+
+    def metricas(self):
+        with self._lock:
+            registros = len(self._indice)
+        return {
+            'registros': registros,
+            'segmento_atual': self._segmento,
+            'pendentes': self._fila.qsize(),
+            'descartadas': self.descartadas,
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: python evidencias.py pasta_evidencias id_acesso [saida.jpg]")
+        sys.exit(1)
+    pasta, id_acesso = sys.argv[1], int(sys.argv[2])
+    saida = sys.argv[3] if len(sys.argv) > 3 else f"evidencia_{id_acesso}.jpg"
+    if not os.path.isdir(pasta):
+        print(f"Pasta {pasta} não encontrada")
+        sys.exit(1)
+    imagem = ArmazemEvidencias(pasta).ler_imagem(id_acesso)
+    if imagem is None:
+        print(f"Acesso {id_acesso} sem evidência gravada")
+        sys.exit(1)
+    cv2.imwrite(saida, imagem)
+    print(f"Evidência do acesso {id_acesso} salva em {saida}")
@@ -0,0 +1,207 @@
+# Importação/sincronização em lote de colaboradores e veículos (CSV ou JSONL)
+# Uso: python importacao.py colaboradores rh.csv
+#      python importacao.py veiculos frota.jsonl --banco carbon_access.db
+# Colaboradores: nome, cargo, tag_id [, id, ativo]        (chave: id, ou tag_id quando o id não vem)
+# Veículos: placa, modelo, marca, cor, tipo_veiculo, colaborador_id ou colaborador_tag  (chave: placa)
+import argparse
+import json
+import os
+import sqlite3
+import uuid
+
+TIPOS_VEICULO = ('Vendedor', 'Diretor', 'Gerente', 'Funcionario', 'Visitante')
+PADRAO_PLACA = r'[A-Z]{3}[0-9][A-Z0-9][0-9]{2}|[A-Z]{3}[0-9]{4}'
+# Abaixo disso não compensa remover e recriar os índices secundários
+MINIMO_PARA_ADIAR_INDICES = 1000
+
+
+def ler_arquivo(origem, formato=None):
+    # 'origem' pode ser um caminho ou um objeto de arquivo (ex.: upload do Streamlit)
+    import pandas as pd
+    nome = origem if isinstance(origem, str) else getattr(origem, 'name', '')
+    formato = formato or ('jsonl' if nome.lower().endswith(('.jsonl', '.json')) else 'csv')
+    if formato == 'jsonl':
+        # Lido como texto campo a campo: pandas converteria ids/tags numéricos em float ('123.0')
+        conteudo = _ler_texto(origem)
+        registros = [json.loads(linha) for linha in conteudo.splitlines() if linha.strip()]
+        df = pd.DataFrame([{chave: '' if valor is None else str(valor) for chave, valor in registro.items()}
+                           for registro in registros], dtype=str)
+    else:
+        df = pd.read_csv(origem, dtype=str, keep_default_na=False)
+    df.columns = [str(coluna).strip().lower() for coluna in df.columns]
+    return df.fillna('').astype(str).apply(lambda coluna: coluna.str.strip())
+
+
+def _ler_texto(origem):
+    if isinstance(origem, str):
+        with open(origem, encoding='utf-8') as arquivo:
+            return arquivo.read()
+    conteudo = origem.read()
+    return conteudo.decode('utf-8') if isinstance(conteudo, bytes) else conteudo
+
+
+def _garantir_colunas(df, colunas):
+    # Colunas opcionais ausentes viram texto vazio
+    return df.assign(**{coluna: '' for coluna in colunas if coluna not in df.columns})
+
+
+def _rejeitar(df, mascara, motivo, rejeitados):
+    # Remove os registros marcados guardando (número do registro, motivo)
+    for indice in df.index[mascara]:
+        rejeitados.append((int(indice) + 1, motivo))
+    return df[~mascara]
+
+
+def _sem_duplicadas(df, chave, rejeitados):
+    # A última ocorrência de cada chave vence
+    return _rejeitar(df, df.duplicated(subset=[chave], keep='last'), f"{chave} repetido no arquivo", rejeitados)
+
+
+def _colunas_obrigatorias(df, colunas):
+    faltando = [coluna for coluna in colunas if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+
+def _gravar_em_lote(conn, tabela, comando, linhas):
+    # Uma única transação; os índices secundários da tabela são recriados só no fim
+    cursor = conn.cursor()
+    conn.commit()
+    cursor.execute("BEGIN")
+    try:
+        indices = []
+        if len(linhas) >= MINIMO_PARA_ADIAR_INDICES:
+            cursor.execute('''
+                SELECT name, sql FROM sqlite_master
+                WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+            ''', (tabela,))
+            indices = cursor.fetchall()
+            for nome, _ in indices:
+                cursor.execute(f"DROP INDEX {nome}")
+        cursor.executemany(comando, linhas)
+        for _, sql in indices:
+            cursor.execute(sql)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def importar_colaboradores(conn, origem, formato=None, simular=False):
+    df = ler_arquivo(origem, formato)
+    _colunas_obrigatorias(df, ['nome', 'cargo', 'tag_id'])
+    df = _garantir_colunas(df, ['id', 'ativo'])
+    total = len(df)
+    rejeitados = []
+
+    # Validação vetorizada (pandas) antes de tocar no banco
+    df = _rejeitar(df, (df['nome'] == '') | (df['cargo'] == '') | (df['tag_id'] == ''),
+                   "nome, cargo e tag_id são obrigatórios", rejeitados)
+    df = _sem_duplicadas(df, 'tag_id', rejeitados)
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, tag_id FROM colaboradores")
+    colaboradores = cursor.fetchall()
+    ids_existentes = {colaborador_id for colaborador_id, _ in colaboradores}
+    por_tag = {tag_id: colaborador_id for colaborador_id, tag_id in colaboradores if tag_id}
+    # Com id informado, o registro atualiza esse colaborador (inclusive trocando o tag_id);
+    # o tag_id novo não pode ser de outro colaborador
+    dono_tag = df['tag_id'].map(por_tag)
+    df = _rejeitar(df, (df['id'] != '') & dono_tag.notna() & (dono_tag != df['id']),
+                   "tag_id já pertence a outro colaborador", rejeitados)
+    # Sem id, colaboradores já cadastrados são encontrados pelo tag_id; novos recebem um UUID, como em add_employee
+    ids = df['id'].where(df['id'] != '', df['tag_id'].map(por_tag)).fillna('')
+    ids = ids.map(lambda valor: valor or str(uuid.uuid4()))
+    # ativo vazio (ou coluna ausente) mantém o valor atual; colaboradores novos entram ativos
+    ativos = df['ativo'].str.lower().map(lambda valor: None if valor == '' else valor in ('1', 'true', 'sim', 's'))
+    df = _sem_duplicadas(df.assign(id=ids, ativo=ativos), 'id', rejeitados)
+    existe = df['id'].isin(ids_existentes)
+
+    linhas = list(df[['id', 'nome', 'cargo', 'tag_id', 'ativo']].itertuples(index=False, name=None))
+    if not simular:
+        _gravar_em_lote(conn, 'colaboradores', '''
+            INSERT INTO colaboradores (id, nome, cargo, tag_id, ativo)
+            VALUES (?1, ?2, ?3, ?4, COALESCE(?5, 1))
+            ON CONFLICT (id) DO UPDATE SET
+                nome = excluded.nome, cargo = excluded.cargo, tag_id = excluded.tag_id,
+                ativo = COALESCE(?5, colaboradores.ativo)
+        ''', [(i, n, c, t, None if a is None else int(a)) for i, n, c, t, a in linhas])
+    return {
+        'total': total,
+        'inseridos': int((~existe).sum()),
+        'atualizados': int(existe.sum()),
+        'rejeitados': len(rejeitados),
+        'erros': sorted(rejeitados),
+    }
+
+
+def importar_veiculos(conn, origem, formato=None, simular=False):
+    df = ler_arquivo(origem, formato)
+    _colunas_obrigatorias(df, ['placa', 'modelo', 'tipo_veiculo'])
+    if 'colaborador_id' not in df.columns and 'colaborador_tag' not in df.columns:
+        raise ValueError("Informe a coluna colaborador_id ou colaborador_tag")
+    df = _garantir_colunas(df, ['marca', 'cor', 'colaborador_id', 'colaborador_tag'])
+    total = len(df)
+    rejeitados = []
+
+    # Normalização e validação de placas vetorizadas
+    df = df.assign(placa=df['placa'].str.replace(r'[\s-]', '', regex=True).str.upper())
+    df = _rejeitar(df, ~df['placa'].str.fullmatch(PADRAO_PLACA),
+                   "placa inválida (use padrão Mercosul AAA0A00 ou antigo AAA0000)", rejeitados)
+    df = _rejeitar(df, df['modelo'] == '', "modelo é obrigatório", rejeitados)
+    df = _rejeitar(df, ~df['tipo_veiculo'].isin(TIPOS_VEICULO),
+                   f"tipo_veiculo deve ser um de: {', '.join(TIPOS_VEICULO)}", rejeitados)
+    df = _sem_duplicadas(df, 'placa', rejeitados)
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, tag_id FROM colaboradores")
+    colaboradores = cursor.fetchall()
+    ids_validos = {colaborador_id for colaborador_id, _ in colaboradores}
+    por_tag = {tag_id: colaborador_id for colaborador_id, tag_id in colaboradores if tag_id}
+    dono = df['colaborador_id'].where(df['colaborador_id'] != '', df['colaborador_tag'].map(por_tag)).fillna('')
+    df = df.assign(colaborador_id=dono)
+    df = _rejeitar(df, ~df['colaborador_id'].isin(ids_validos), "colaborador não encontrado", rejeitados)
+
+    cursor.execute("SELECT placa FROM veiculos")
+    existe = df['placa'].isin({linha[0] for linha in cursor.fetchall()})
+
+    linhas = list(df[['placa', 'modelo', 'marca', 'cor', 'colaborador_id', 'tipo_veiculo']]
+                  .itertuples(index=False, name=None))
+    if not simular:
+        _gravar_em_lote(conn, 'veiculos', '''
+            INSERT INTO veiculos (placa, modelo, marca, cor, colaborador_id, tipo_veiculo)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (placa) DO UPDATE SET
+                modelo = excluded.modelo, marca = excluded.marca, cor = excluded.cor,
+                colaborador_id = excluded.colaborador_id, tipo_veiculo = excluded.tipo_veiculo
+        ''', linhas)
+    return {
+        'total': total,
+        'inseridos': int((~existe).sum()),
+        'atualizados': int(existe.sum()),
+        'rejeitados': len(rejeitados),
+        'erros': sorted(rejeitados),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa colaboradores ou veículos em lote")
+    parser.add_argument('tipo', choices=['colaboradores', 'veiculos'])
+    parser.add_argument('arquivo', help="Arquivo CSV ou JSONL")
+    parser.add_argument('--banco', default='carbon_access.db')
+    parser.add_argument('--formato', choices=['csv', 'jsonl'])
+    parser.add_argument('--simular', action='store_true', help="Só valida e conta, sem gravar")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.banco):
+        parser.error(f"Banco {args.banco} não encontrado (inicie o app uma vez para criá-lo)")
+    conn = sqlite3.connect(args.banco)
+    importar = importar_colaboradores if args.tipo == 'colaboradores' else importar_veiculos
+    resumo = importar(conn, args.arquivo, args.formato, args.simular)
+    for registro, motivo in resumo.pop('erros'):
+        print(f"registro {registro}: {motivo}")
+    print(json.dumps(resumo, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
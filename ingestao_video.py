@@ -0,0 +1,190 @@
+# Ingestão headless de arquivos de vídeo e streams (RTSP/HTTP) para replay e auditoria
+# Uso: python ingestao_video.py gravacao.mp4 --modo passo --passo 5 --saida decisoes.jsonl
+#      python ingestao_video.py rtsp://camera/stream --modo tempo --intervalo 0.5 --velocidade 1
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+import cv2
+
+MODOS = ('passo', 'tempo', 'chave')
+
+
+def abrir_fonte(fonte, apenas_pacotes=False):
+    # Índice de câmera ('0'), caminho de arquivo ou URL de stream
+    if isinstance(fonte, str) and fonte.isdigit():
+        fonte = int(fonte)
+    if apenas_pacotes:
+        # Lê os pacotes comprimidos sem decodificar (backend FFmpeg)
+        return cv2.VideoCapture(fonte, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+    return cv2.VideoCapture(fonte)
+
+
+def suporta_quadros_chave():
+    return hasattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME')
+
+
+def _indices_quadros_chave(fonte):
+    # Percorre só os pacotes, sem decodificar, marcando os quadros-chave.
+    # Lista vazia quando o backend não abre a fonte nesse modo (sem FFmpeg ou sem CAP_PROP_FORMAT=-1)
+    cap = abrir_fonte(fonte, apenas_pacotes=True)
+    indices = []
+    try:
+        if not cap.isOpened():
+            return indices
+        indice = 0
+        while cap.grab():
+            if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                indices.append(indice)
+            indice += 1
+    finally:
+        cap.release()
+    return indices
+
+
+def _quadros_chave(cap, indices):
+    # Pula direto para cada quadro-chave: decodifica apenas ele, sem os quadros intermediários
+    for indice in indices:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, indice)
+        ok, quadro = cap.read()
+        if not ok:
+            break
+        yield indice, cap.get(cv2.CAP_PROP_POS_MSEC), quadro
+
+
+def _quadros_sequenciais(cap, modo, passo, intervalo):
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    indice = -1
+    proximo_ms = 0.0
+    while True:
+        # grab() avança sem converter o quadro; retrieve() só nos quadros amostrados
+        if not cap.grab():
+            break
+        indice += 1
+        tempo_ms = cap.get(cv2.CAP_PROP_POS_MSEC) or indice * 1000.0 / fps
+        if modo == 'passo':
+            if indice % passo:
+                continue
+        elif tempo_ms < proximo_ms:
+            continue
+        else:
+            proximo_ms = tempo_ms + intervalo * 1000.0
+        ok, quadro = cap.retrieve()
+        if not ok:
+            break
+        yield indice, tempo_ms, quadro
+
+
+def amostrar_quadros(fonte, modo='passo', passo=1, intervalo=1.0, velocidade=0.0):
+    # Gera (indice, tempo_ms, quadro). velocidade=0 processa o mais rápido possível,
+    # 1 respeita o tempo real e valores maiores aceleram o replay.
+    if modo not in MODOS:
+        raise ValueError(f"Modo de amostragem inválido: {modo} (use {', '.join(MODOS)})")
+    cap = abrir_fonte(fonte)
+    if not cap.isOpened():
+        raise IOError(f"Não foi possível abrir a fonte de vídeo: {fonte}")
+    if modo == 'chave' and (not suporta_quadros_chave() or cap.get(cv2.CAP_PROP_FRAME_COUNT) <= 0):
+        # OpenCV antigo ou stream ao vivo (sem seek): aproxima por amostragem temporal
+        modo = 'tempo'
+    indices = _indices_quadros_chave(fonte) if modo == 'chave' else []
+    if modo == 'chave' and not indices:
+        # Leitura de pacotes indisponível: sem o fallback a auditoria terminaria sem nenhum quadro
+        modo = 'tempo'
+
+    inicio_real = time.monotonic()
+    try:
+        if modo == 'chave':
+            quadros = _quadros_chave(cap, indices)
+        else:
+            quadros = _quadros_sequenciais(cap, modo, max(1, int(passo)), intervalo)
+        for indice, tempo_ms, quadro in quadros:
+            if velocidade > 0:
+                atraso = tempo_ms / 1000.0 / velocidade - (time.monotonic() - inicio_real)
+                if atraso > 0:
+                    time.sleep(atraso)
+            yield indice, tempo_ms, quadro
+    finally:
+        cap.release()
+
+
+def abrir_saida(saida):
+    # None = banco do app; '-' = stdout; caminho = arquivo JSONL (anexado)
+    if not saida:
+        return None
+    return sys.stdout if saida == '-' else open(saida, 'a', encoding='utf-8')
+
+
+def fechar_saida(arquivo):
+    if arquivo and arquivo is not sys.stdout:
+        arquivo.close()
+
+
+def gravar_decisao(app, arquivo, resultado, recorte=None, data_hora=None, **extras):
+    if arquivo:
+        registro = dict(resultado, **extras, data_hora=data_hora or datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        arquivo.flush()
+    else:
+        app.registrar_acesso(resultado, data_hora, evidencia=recorte)
+
+
+def ingerir_fonte(app, fonte, modo='passo', passo=1, intervalo=1.0, velocidade=0.0, saida=None,
+                  inicio_gravacao=None, registrar_falhas=False, intervalo_repeticao=10.0):
+    # Decide o acesso de cada quadro amostrado. saida=None grava no banco do app;
+    # um caminho (ou '-' para stdout) grava as decisões em JSONL.
+    arquivo = abrir_saida(saida)
+    ultima_vez = {}  # placa -> tempo_ms da última decisão, evita repetir o mesmo carro
+    resumo = {'quadros': 0, 'decisoes': 0, 'liberados': 0, 'negados': 0, 'nao_reconhecidos': 0}
+    try:
+        for indice, tempo_ms, quadro in amostrar_quadros(fonte, modo, passo, intervalo, velocidade):
+            resumo['quadros'] += 1
+            placa, recorte = app.ler_placa_com_recorte(quadro)
+            resultado = app.avaliar_placa(placa)
+            if not placa:
+                resumo['nao_reconhecidos'] += 1
+                if not registrar_falhas:
+                    continue
+            elif placa in ultima_vez and tempo_ms - ultima_vez[placa] < intervalo_repeticao * 1000.0:
+                continue
+            else:
+                ultima_vez[placa] = tempo_ms
+                resumo['liberados' if resultado['liberado'] else 'negados'] += 1
+            resumo['decisoes'] += 1
+
+            data_hora = None
+            if inicio_gravacao:
+                data_hora = (inicio_gravacao + timedelta(milliseconds=tempo_ms)).strftime("%Y-%m-%d %H:%M:%S")
+            gravar_decisao(app, arquivo, resultado, recorte, data_hora,
+                           fonte=str(fonte), quadro=indice, tempo_ms=round(tempo_ms))
+    finally:
+        fechar_saida(arquivo)
+    return resumo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processa vídeos ou streams sem interface gráfica")
+    parser.add_argument('fonte', help="Arquivo de vídeo, URL de stream ou índice da câmera")
+    parser.add_argument('--modo', choices=MODOS, default='passo',
+                        help="passo: a cada N quadros; tempo: a cada N segundos; chave: só quadros-chave")
+    parser.add_argument('--passo', type=int, default=1)
+    parser.add_argument('--intervalo', type=float, default=1.0, help="Segundos entre amostras no modo 'tempo'")
+    parser.add_argument('--velocidade', type=float, default=0.0,
+                        help="0 = o mais rápido possível, 1 = tempo real, 4 = 4x")
+    parser.add_argument('--saida', help="Arquivo JSONL ('-' para stdout); sem esta opção grava no banco")
+    parser.add_argument('--banco', default='placas_liberadas.db')
+    parser.add_argument('--inicio-gravacao', help="Data/hora do início da gravação (YYYY-MM-DD HH:MM:SS)")
+    parser.add_argument('--registrar-falhas', action='store_true', help="Registra também quadros sem placa")
+    args = parser.parse_args(argv)
+
+    from placa_reader import PlacaReaderApp
+    app = PlacaReaderApp(args.banco)
+    inicio_gravacao = datetime.strptime(args.inicio_gravacao, "%Y-%m-%d %H:%M:%S") if args.inicio_gravacao else None
+    resumo = ingerir_fonte(app, args.fonte, args.modo, args.passo, args.intervalo, args.velocidade,
+                           args.saida, inicio_gravacao, args.registrar_falhas)
+    print(json.dumps(resumo, ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
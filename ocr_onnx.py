@@ -0,0 +1,185 @@
+# Backend ONNX Runtime (int8) para os modelos do EasyOCR em PCs de portaria sem GPU
+# Exportação (precisa de easyocr, torch e onnxruntime apenas nesta etapa):
+#   python ocr_onnx.py exportar modelos_onnx
+# Em produção basta onnxruntime + opencv: PlacaReaderApp(motor_ocr='onnx')
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+ARQUIVO_DETECTOR = 'detector_int8.onnx'
+ARQUIVO_RECONHECEDOR = 'reconhecedor_int8.onnx'
+ARQUIVO_CARACTERES = 'caracteres.json'
+ALTURA_RECONHECEDOR = 64  # imgH dos modelos de reconhecimento do EasyOCR
+
+
+def exportar_modelos(pasta_saida='modelos_onnx', idiomas=('en',), opset=17):
+    import torch
+    import easyocr
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    reader = easyocr.Reader(list(idiomas), gpu=False)
+
+    def _modulo(modelo):
+        return modelo.module if isinstance(modelo, torch.nn.DataParallel) else modelo
+
+    detector = _modulo(reader.detector).eval()
+    reconhecedor = _modulo(reader.recognizer).eval()
+
+    class _Reconhecedor(torch.nn.Module):
+        # O forward do EasyOCR recebe um argumento 'text' que não é usado na inferência
+        def __init__(self, modelo):
+            super().__init__()
+            self.modelo = modelo
+
+        def forward(self, imagem):
+            return self.modelo(imagem, None)
+
+    modelos = [
+        (detector, torch.randn(1, 3, 640, 640), ARQUIVO_DETECTOR,
+         ['imagem'], ['mapas', 'caracteristicas'], {'imagem': {0: 'lote', 2: 'altura', 3: 'largura'}}),
+        (_Reconhecedor(reconhecedor), torch.randn(1, 1, ALTURA_RECONHECEDOR, 256), ARQUIVO_RECONHECEDOR,
+         ['imagem'], ['logits'], {'imagem': {0: 'lote', 3: 'largura'}, 'logits': {0: 'lote', 1: 'passos'}}),
+    ]
+    for modelo, exemplo, arquivo, entradas, saidas, eixos in modelos:
+        caminho_fp32 = os.path.join(pasta_saida, arquivo.replace('_int8', '_fp32'))
+        with torch.no_grad():
+            torch.onnx.export(modelo, exemplo, caminho_fp32, input_names=entradas, output_names=saidas,
+                              dynamic_axes=eixos, opset_version=opset)
+        # Quantização dinâmica: pesos em int8, ativações quantizadas em tempo de execução
+        quantize_dynamic(caminho_fp32, os.path.join(pasta_saida, arquivo), weight_type=QuantType.QInt8)
+
+    # Índice 0 é o branco do CTC
+    with open(os.path.join(pasta_saida, ARQUIVO_CARACTERES), 'w', encoding='utf-8') as arquivo:
+        json.dump(['[blank]'] + list(reader.character), arquivo, ensure_ascii=False)
+    return pasta_saida
+
+
+class LeitorOCROnnx:
+    # Mesma interface de easyocr.Reader.readtext: lista de (caixa, texto, confiança)
+    def __init__(self, pasta_modelos='modelos_onnx', threads=2, tamanho_maximo=1280,
+                 limiar_texto=0.7, limiar_baixo=0.4, limiar_ligacao=0.4,
+                 limiar_centro=0.5, limiar_altura=0.5, limiar_distancia=0.5):
+        import onnxruntime as ort
+
+        opcoes = ort.SessionOptions()
+        opcoes.intra_op_num_threads = threads
+        opcoes.inter_op_num_threads = 1
+        opcoes.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        provedores = ['CPUExecutionProvider']
+        self.detector = ort.InferenceSession(os.path.join(pasta_modelos, ARQUIVO_DETECTOR), opcoes, providers=provedores)
+        self.reconhecedor = ort.InferenceSession(os.path.join(pasta_modelos, ARQUIVO_RECONHECEDOR), opcoes,
+                                                 providers=provedores)
+        with open(os.path.join(pasta_modelos, ARQUIVO_CARACTERES), encoding='utf-8') as arquivo:
+            self.caracteres = json.load(arquivo)
+        self.tamanho_maximo = tamanho_maximo
+        self.limiar_texto = limiar_texto
+        self.limiar_baixo = limiar_baixo
+        self.limiar_ligacao = limiar_ligacao
+        # Mesmos padrões de ycenter_ths, height_ths e width_ths do readtext do EasyOCR
+        self.limiar_centro = limiar_centro
+        self.limiar_altura = limiar_altura
+        self.limiar_distancia = limiar_distancia
+
+    def _detectar(self, imagem):
+        # Pré-processamento do CRAFT: RGB, lado maior limitado, dimensões múltiplas de 32
+        rgb = cv2.cvtColor(imagem, cv2.COLOR_GRAY2RGB) if imagem.ndim == 2 else cv2.cvtColor(imagem, cv2.COLOR_BGR2RGB)
+        altura, largura = rgb.shape[:2]
+        escala = min(1.0, self.tamanho_maximo / max(altura, largura))
+        nova_altura, nova_largura = int(altura * escala), int(largura * escala)
+        redimensionada = cv2.resize(rgb, (nova_largura, nova_altura), interpolation=cv2.INTER_LINEAR)
+        tela = np.zeros((-(-nova_altura // 32) * 32, -(-nova_largura // 32) * 32, 3), dtype=np.float32)
+        tela[:nova_altura, :nova_largura] = redimensionada
+        tela = (tela - np.array([0.485, 0.456, 0.406]) * 255.0) / (np.array([0.229, 0.224, 0.225]) * 255.0)
+        entrada = tela.transpose(2, 0, 1)[np.newaxis].astype(np.float32)
+
+        mapas = self.detector.run(['mapas'], {'imagem': entrada})[0][0]
+        mapa_texto, mapa_ligacao = mapas[:, :, 0], mapas[:, :, 1]
+
+        # Versão simplificada do getDetBoxes do CRAFT: componentes conexos de texto + ligação
+        texto = mapa_texto > self.limiar_baixo
+        ligacao = mapa_ligacao > self.limiar_ligacao
+        combinado = np.logical_or(texto, ligacao).astype(np.uint8)
+        quantidade, rotulos, estatisticas, _ = cv2.connectedComponentsWithStats(combinado, connectivity=4)
+        caixas = []
+        fator = 2.0 / escala  # os mapas têm metade da resolução da entrada
+        for k in range(1, quantidade):
+            x, y, w, h, area = estatisticas[k]
+            if area < 10 or mapa_texto[rotulos == k].max() < self.limiar_texto:
+                continue
+            margem = int(np.sqrt(area * min(w, h) / (w * h)) * 2)
+            x0, y0 = max(0, x - margem) * fator, max(0, y - margem) * fator
+            x1, y1 = min(largura, (x + w + margem) * fator), min(altura, (y + h + margem) * fator)
+            caixas.append((int(x0), int(y0), int(x1), int(y1)))
+        return caixas
+
+    def _reconhecer(self, cinza):
+        altura, largura = cinza.shape[:2]
+        nova_largura = max(16, int(ALTURA_RECONHECEDOR * largura / max(altura, 1)))
+        redimensionada = cv2.resize(cinza, (nova_largura, ALTURA_RECONHECEDOR), interpolation=cv2.INTER_CUBIC)
+        entrada = ((redimensionada.astype(np.float32) / 255.0 - 0.5) / 0.5)[np.newaxis, np.newaxis]
+        logits = self.reconhecedor.run(['logits'], {'imagem': entrada})[0][0]
+        # Softmax + decodificação gulosa do CTC (colapsa repetições e remove o branco)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilidades = exp / exp.sum(axis=1, keepdims=True)
+        indices = probabilidades.argmax(axis=1)
+        texto, confiancas, anterior = [], [], 0
+        for passo, indice in enumerate(indices):
+            if indice != 0 and indice != anterior:
+                texto.append(self.caracteres[indice])
+                confiancas.append(probabilidades[passo, indice])
+            anterior = indice
+        return ''.join(texto), float(np.mean(confiancas)) if confiancas else 0.0
+
+    def _agrupar(self, caixas):
+        # Equivalente ao group_text_box do EasyOCR para caixas horizontais: junta as caixas
+        # da mesma linha separadas por pouco espaço. Sem isso uma placa com espaço ou hífen
+        # ('ABC 1D23') vira duas leituras e nenhuma passa na validação
+        linhas = []
+        for caixa in sorted(caixas, key=lambda c: (c[1] + c[3]) / 2):
+            altura, centro = caixa[3] - caixa[1], (caixa[1] + caixa[3]) / 2
+            if linhas:
+                alturas = [c[3] - c[1] for c in linhas[-1]]
+                centros = [(c[1] + c[3]) / 2 for c in linhas[-1]]
+                media_altura, media_centro = np.mean(alturas), np.mean(centros)
+                if (abs(media_centro - centro) < self.limiar_centro * media_altura
+                        and abs(media_altura - altura) < self.limiar_altura * media_altura):
+                    linhas[-1].append(caixa)
+                    continue
+            linhas.append([caixa])
+
+        agrupadas = []
+        for linha in linhas:
+            atual = None
+            for caixa in sorted(linha):
+                if atual is not None and caixa[0] - atual[2] < self.limiar_distancia * (atual[3] - atual[1]):
+                    atual = (atual[0], min(atual[1], caixa[1]), max(atual[2], caixa[2]), max(atual[3], caixa[3]))
+                else:
+                    if atual is not None:
+                        agrupadas.append(atual)
+                    atual = caixa
+            agrupadas.append(atual)
+        return agrupadas
+
+    def readtext(self, imagem):
+        cinza = imagem if imagem.ndim == 2 else cv2.cvtColor(imagem, cv2.COLOR_BGR2GRAY)
+        resultados = []
+        for x0, y0, x1, y1 in self._agrupar(self._detectar(imagem)):
+            recorte = cinza[y0:y1, x0:x1]
+            if recorte.size == 0:
+                continue
+            texto, confianca = self._reconhecer(recorte)
+            if texto:
+                resultados.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], texto, confianca))
+        return resultados
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'exportar':
+        print("Uso: python ocr_onnx.py exportar [pasta_saida]")
+        sys.exit(1)
+    pasta = exportar_modelos(sys.argv[2] if len(sys.argv) > 2 else 'modelos_onnx')
+    print(f"Modelos ONNX int8 salvos em {pasta}")
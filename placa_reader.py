@@ -1,16 +1,78 @@
 import cv2
+import os
 import sqlite3
+import threading
 from datetime import datetime
 import re
-import easyocr
-import pandas as pd
+from estatisticas import criar_tabelas_estatisticas, reconstruir_estatisticas, acumular_acesso
+from arquivamento import MESES_RETENCAO_PADRAO, precisa_arquivar, arquivar_acessos, consultar_periodo
+from cache_ocr import CacheOCR
+from ingestao_video import ingerir_fonte
+from evidencias import ArmazemEvidencias
 
 class PlacaReaderApp:
-    def __init__(self):
+    def __init__(self, caminho_banco='placas_liberadas.db', meses_retencao=MESES_RETENCAO_PADRAO,
+                 cache_capacidade=256, cache_ttl=300,
+                 motor_ocr='easyocr', pasta_modelos_onnx='modelos_onnx', threads_onnx=2,
+                 carregar_em_segundo_plano=True, pasta_evidencias=None):
         # Configurações iniciais
-        self.conn = sqlite3.connect('placas_liberadas.db')
+        self.caminho_banco = caminho_banco
+        self.meses_retencao = meses_retencao
+        self.cache_ocr = CacheOCR(cache_capacidade, cache_ttl)
+        # Acessível pelas threads do agendador de faixas (ver agendador_faixas.py)
+        self.conn = sqlite3.connect(caminho_banco, check_same_thread=False)
         self.criar_banco_dados()
-        self.reader = easyocr.Reader(['en'], gpu=False)  # Inicializa EasyOCR
+        if precisa_arquivar(self.conn, self.meses_retencao):
+            self.arquivar_historico()
+        # Recortes das placas ficam fora do banco, em segmentos append-only
+        if pasta_evidencias is None and caminho_banco != ':memory:':
+            pasta_evidencias = f"{os.path.splitext(caminho_banco)[0]}_evidencias"
+        self.evidencias = ArmazemEvidencias(pasta_evidencias) if pasta_evidencias else None
+
+        # O modelo de OCR carrega em segundo plano; consultas ao banco já podem ser atendidas
+        self._reader = None
+        self._erro_leitor = None
+        self.leitor_pronto = threading.Event()
+        argumentos = (motor_ocr, pasta_modelos_onnx, threads_onnx)
+        if carregar_em_segundo_plano:
+            threading.Thread(target=self._carregar_leitor, args=argumentos, name='carga-ocr', daemon=True).start()
+        else:
+            self._carregar_leitor(*argumentos)
+
+    def _carregar_leitor(self, motor_ocr, pasta_modelos_onnx, threads_onnx):
+        try:
+            self._reader = self.criar_leitor(motor_ocr, pasta_modelos_onnx, threads_onnx)
+        except Exception as e:
+            self._erro_leitor = e
+        finally:
+            self.leitor_pronto.set()
+
+    def criar_leitor(self, motor_ocr, pasta_modelos_onnx, threads_onnx):
+        # Imports pesados só aqui, fora do caminho de inicialização
+        if motor_ocr == 'onnx':
+            # Modelos int8 exportados com 'python ocr_onnx.py exportar'; não carrega PyTorch
+            from ocr_onnx import LeitorOCROnnx
+            return LeitorOCROnnx(pasta_modelos_onnx, threads_onnx)
+        if motor_ocr != 'easyocr':
+            raise ValueError(f"Motor de OCR desconhecido: {motor_ocr}")
+        import easyocr
+        return easyocr.Reader(['en'], gpu=False)  # Inicializa EasyOCR
+
+    def estado_leitor(self):
+        if not self.leitor_pronto.is_set():
+            return 'carregando'
+        return 'erro' if self._erro_leitor else 'pronto'
+
+    def aguardar_leitor(self, timeout=None):
+        return self.leitor_pronto.wait(timeout)
+
+    @property
+    def reader(self):
+        # Bloqueia só quem realmente precisa do OCR
+        self.leitor_pronto.wait()
+        if self._erro_leitor:
+            raise RuntimeError(f"Falha ao carregar o modelo de OCR: {self._erro_leitor}") from self._erro_leitor
+        return self._reader
 
     def criar_banco_dados(self):
         # Criando tabela de placas liberadas
@@ -34,7 +96,10 @@ class PlacaReaderApp:
                 mensagem TEXT
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_historico_acessos_data_hora ON historico_acessos (data_hora)")
         self.conn.commit()
+        if criar_tabelas_estatisticas(self.conn):
+            reconstruir_estatisticas(self.conn, self.caminho_banco)
 
     def validar_placa(self, placa):
         # Valida formato Mercosul: AAA0A00
@@ -42,21 +107,74 @@ class PlacaReaderApp:
         return bool(re.match(padrao_mercosul, placa))
 
     def ler_placa(self, imagem_path):
+        return self.ler_placa_imagem(cv2.imread(imagem_path))
+
+    def ler_placa_imagem(self, img):
+        return self.ler_placa_com_recorte(img)[0]
+
+    def ler_placa_com_recorte(self, img, cache=None):
+        # Retorna (placa, recorte da placa no quadro original).
+        # 'cache' permite um CacheOCR por câmera (ver agendador_faixas.py); padrão: self.cache_ocr
         # Pré-processamento da imagem
-        img = cv2.imread(imagem_path)
         if img is None:
-            return None
+            return None, None
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         blur = cv2.GaussianBlur(gray, (3, 3), 0)
         thresh = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
 
-        # Reconhecimento com EasyOCR
-        resultados = self.reader.readtext(thresh)
+        # O cache é indexado pelo recorte da região da placa, nunca pelo quadro inteiro,
+        # e só reaproveita recortes idênticos (ver cache_ocr.py). Sem região candidata,
+        # o OCR roda sem cache.
+        regiao = self.localizar_regiao_placa(blur)
+        if regiao is None:
+            placa, caixa = self.localizar_placa(thresh)
+        else:
+            rx0, ry0, rx1, ry1 = regiao
+
+            def reconhecer(_):
+                placa, caixa = self.localizar_placa(thresh)
+                if placa is None:
+                    return None
+                # Caixa guardada relativa à região, para valer no próximo quadro
+                return placa, (caixa[0] - rx0, caixa[1] - ry0, caixa[2] - rx0, caixa[3] - ry0)
+
+            cache = self.cache_ocr if cache is None else cache
+            lido, _ = cache.obter_ou_calcular(blur[ry0:ry1, rx0:rx1], reconhecer, guardar_vazios=False)
+            if lido is None:
+                return None, None
+            placa, (x0, y0, x1, y1) = lido
+            caixa = (max(0, x0 + rx0), max(0, y0 + ry0), x1 + rx0, y1 + ry0)
+        if caixa is None:
+            return placa, None
+        x0, y0, x1, y1 = caixa
+        recorte = img[y0:y1, x0:x1]
+        return placa, recorte if recorte.size else None
+
+    def localizar_regiao_placa(self, cinza):
+        # Candidata barata à placa: maior contorno com proporção de placa (~3:1).
+        # RETR_LIST porque a placa fica dentro do contorno do carro
+        bordas = cv2.Canny(cinza, 100, 200)
+        contornos, _ = cv2.findContours(bordas, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        melhor, maior_area = None, 0
+        for contorno in contornos:
+            x, y, w, h = cv2.boundingRect(contorno)
+            if w > 50 and h > 15 and 2.0 <= w / h <= 6.0 and w * h > maior_area:
+                melhor, maior_area = (x, y, x + w, y + h), w * h
+        return melhor
+
+    def reconhecer_placa(self, imagem):
+        return self.localizar_placa(imagem)[0]
+
+    def localizar_placa(self, imagem):
+        # Reconhecimento com EasyOCR; retorna (placa, caixa x0, y0, x1, y1)
+        resultados = self.reader.readtext(imagem)
         for (bbox, texto, prob) in resultados:
             placa = ''.join(e for e in texto if e.isalnum()).upper()
             if self.validar_placa(placa):
-                return placa
-        return None
+                xs = [int(ponto[0]) for ponto in bbox]
+                ys = [int(ponto[1]) for ponto in bbox]
+                return placa, (max(0, min(xs)), max(0, min(ys)), max(xs), max(ys))
+        return None, None
 
     def verificar_placa(self, placa):
         cursor = self.conn.cursor()
@@ -75,29 +193,58 @@ class PlacaReaderApp:
         except sqlite3.IntegrityError:
             return False, "Placa já cadastrada"
 
-    def registrar_acesso(self, resultado):
+    def registrar_acesso(self, resultado, data_hora=None, evidencia=None):
         cursor = self.conn.cursor()
+        data_hora = data_hora or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         cursor.execute("INSERT INTO historico_acessos (placa, data_hora, liberado, mensagem) VALUES (?, ?, ?, ?)",
-                      (resultado.get('placa', ''), datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                      (resultado.get('placa', ''), data_hora,
                        resultado.get('liberado', False), resultado.get('mensagem', '')))
+        # Lido logo após o INSERT: os comandos seguintes no mesmo cursor podem alterá-lo
+        acesso_id = cursor.lastrowid
+        acumular_acesso(cursor, data_hora, resultado.get('placa', ''), '', resultado.get('liberado', False))
         self.conn.commit()
+        # A gravação da imagem é assíncrona: não aumenta a latência do registro
+        if evidencia is not None and self.evidencias:
+            self.evidencias.guardar(acesso_id, evidencia)
+        return acesso_id
 
-    def processar_entrada_veiculo(self, imagem_path):
-        placa = self.ler_placa(imagem_path)
+    def ler_evidencia(self, id_acesso):
+        return self.evidencias.ler_imagem(id_acesso) if self.evidencias else None
+
+    def exportar_evidencia(self, id_acesso, arquivo_saida=None):
+        # Salva o recorte do acesso (coluna ID do relatório CSV) para auditoria
+        imagem = self.ler_evidencia(id_acesso)
+        if imagem is None:
+            return None
+        arquivo_saida = arquivo_saida or f"evidencia_{id_acesso}.jpg"
+        cv2.imwrite(arquivo_saida, imagem)
+        return arquivo_saida
+
+    def avaliar_placa(self, placa):
         if placa:
             liberado = self.verificar_placa(placa)
-            resultado = {
+            return {
                 'placa': placa,
                 'liberado': liberado,
                 'mensagem': 'Acesso LIBERADO' if liberado else 'Acesso NEGADO'
             }
-        else:
-            resultado = {'erro': 'Placa não reconhecida'}
-        self.registrar_acesso(resultado)
+        return {'erro': 'Placa não reconhecida'}
+
+    def processar_imagem(self, img):
+        placa, recorte = self.ler_placa_com_recorte(img)
+        resultado = self.avaliar_placa(placa)
+        self.registrar_acesso(resultado, evidencia=recorte)
         return resultado
 
-    def processar_camera_tempo_real(self):
-        cap = cv2.VideoCapture(0)
+    def processar_entrada_veiculo(self, imagem_path):
+        return self.processar_imagem(cv2.imread(imagem_path))
+
+    def processar_video(self, fonte, **opcoes):
+        # Modo headless para arquivos de vídeo e streams (ver ingestao_video.py)
+        return ingerir_fonte(self, fonte, **opcoes)
+
+    def processar_camera_tempo_real(self, fonte=0):
+        cap = cv2.VideoCapture(fonte)
         if not cap.isOpened():
             return {'erro': 'Não foi possível acessar a câmera'}
 
@@ -106,9 +253,7 @@ class PlacaReaderApp:
             if not ret:
                 break
 
-            # Salva frame temporário para processamento
-            cv2.imwrite('temp_frame.jpg', frame)
-            resultado = self.processar_entrada_veiculo('temp_frame.jpg')
+            resultado = self.processar_imagem(frame)
 
             # Exibe o resultado no frame
             texto = resultado.get('mensagem', resultado.get('erro', ''))
@@ -124,11 +269,15 @@ class PlacaReaderApp:
         cv2.destroyAllWindows()
         return resultado
 
-    def gerar_relatorio_csv(self, arquivo_saida='relatorio_acessos.csv'):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM historico_acessos")
-        dados = cursor.fetchall()
+    def arquivar_historico(self, compactar=False):
+        return arquivar_acessos(self.conn, self.caminho_banco, self.meses_retencao, compactar)
+
+    def gerar_relatorio_csv(self, arquivo_saida='relatorio_acessos.csv', inicio=None, fim=None):
+        # Consulta o banco principal e, se o período pedir, os arquivos mensais
+        dados = consultar_periodo(self.conn, self.caminho_banco,
+                                  "SELECT * FROM {acessos} ORDER BY data_hora DESC", inicio, fim)
         colunas = ['ID', 'Placa', 'Data/Hora', 'Liberado', 'Mensagem']
+        import pandas as pd  # usado só nos relatórios
         df = pd.DataFrame(dados, columns=colunas)
         df.to_csv(arquivo_saida, index=False)
         return f"Relatório salvo em {arquivo_saida}"
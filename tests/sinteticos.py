@@ -0,0 +1,43 @@
+# Quadros e leitor de OCR sintéticos compartilhados pelos testes
+import cv2
+import numpy as np
+import pytest
+
+from placa_reader import PlacaReaderApp
+
+
+def quadro_com_placa(texto):
+    # Mesmo cenário e mesma posição do carro; só os caracteres da placa mudam
+    quadro = np.full((480, 640, 3), 90, dtype=np.uint8)
+    cv2.rectangle(quadro, (160, 200), (480, 420), (40, 40, 40), -1)
+    cv2.rectangle(quadro, (220, 300), (420, 360), (255, 255, 255), -1)
+    cv2.putText(quadro, texto, (228, 343), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    return quadro
+
+
+class LeitorFalso:
+    def __init__(self, placas):
+        self.placas = list(placas)
+        self.chamadas = 0
+
+    def readtext(self, imagem):
+        # Repete a última placa quando a lista acaba
+        placa = self.placas[min(self.chamadas, len(self.placas) - 1)]
+        self.chamadas += 1
+        return [([[225, 305], [415, 305], [415, 355], [225, 355]], placa, 0.9)] if placa else []
+
+
+def criar_app(placas, **opcoes):
+    # Leitor falso no lugar do EasyOCR: devolve as placas na ordem dada
+    app = PlacaReaderApp(':memory:', carregar_em_segundo_plano=False, **opcoes)
+    app._reader, app._erro_leitor = LeitorFalso(placas), None
+    return app
+
+
+def gravar_video(caminho, quadros):
+    escritor = cv2.VideoWriter(str(caminho), cv2.VideoWriter_fourcc(*'MJPG'), 10, (640, 480))
+    if not escritor.isOpened():
+        pytest.skip("OpenCV sem codificador MJPG")
+    for quadro in quadros:
+        escritor.write(quadro)
+    escritor.release()
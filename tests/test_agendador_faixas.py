@@ -0,0 +1,109 @@
+import json
+import time
+
+import numpy as np
+
+from agendador_faixas import AgendadorFaixas, Faixa
+from sinteticos import LeitorFalso, criar_app, gravar_video, quadro_com_placa
+
+FUNDO = np.full((480, 640, 3), 90, dtype=np.uint8)
+
+
+def video_com_movimento(caminho, quantidade):
+    # Carro aparecendo e sumindo: todo quadro difere do anterior
+    gravar_video(caminho, [quadro_com_placa('ABC1D23') if numero % 2 else FUNDO for numero in range(quantidade)])
+    return str(caminho)
+
+
+def video_parado(caminho, quantidade):
+    gravar_video(caminho, [FUNDO] * quantidade)
+    return str(caminho)
+
+
+def test_faixas_nao_compartilham_cache(tmp_path):
+    video = tmp_path / 'faixa.avi'
+    gravar_video(video, [quadro_com_placa('ABC1D23')] * 3)
+    # Com um cache único, a segunda faixa herdaria a leitura da primeira
+    app = criar_app(['ABC1D23'])
+    # Quadros idênticos não têm movimento; intervalo_ocioso=0 evita que a faixa ociosa os descarte
+    opcoes = dict(tamanho_fila=8, descartar_quando_cheia=False, intervalo_ocioso=0)
+    faixas = [Faixa('entrada1', str(video), 'entrada', **opcoes), Faixa('saida1', str(video), 'saida', **opcoes)]
+    saida = tmp_path / 'decisoes.jsonl'
+    agendador = AgendadorFaixas(app, faixas, workers=1, saida=str(saida))
+    agendador.iniciar()
+    metricas = agendador.aguardar(timeout=30)
+
+    assert faixas[0].cache_ocr is not faixas[1].cache_ocr
+    assert app.cache_ocr.metricas()['entradas'] == 0
+    # O primeiro quadro de cada faixa é sempre uma falha: nada vem do cache da outra faixa
+    falhas = 0
+    for nome in ('entrada1', 'saida1'):
+        assert metricas[nome]['processados'] == 3
+        assert metricas[nome]['cache']['falhas'] >= 1
+        assert metricas[nome]['cache']['acertos'] >= 1
+        falhas += metricas[nome]['cache']['falhas']
+    assert app._reader.chamadas == falhas
+    decisoes = [json.loads(linha) for linha in saida.read_text(encoding='utf-8').splitlines()]
+    assert sorted(decisao['faixa'] for decisao in decisoes) == ['entrada1', 'saida1']
+
+
+def test_entrada_com_carro_aguardando_e_atendida_primeiro(tmp_path):
+    video = video_com_movimento(tmp_path / 'faixa.avi', 4)
+    opcoes = dict(tamanho_fila=8, velocidade=0)
+    # A saída vem primeiro na lista e tem menos serviço acumulado; a entrada ainda passa na frente
+    faixas = [Faixa('saida1', video, 'saida', **opcoes), Faixa('entrada1', video, 'entrada', **opcoes)]
+    faixas[1].servico = 5.0
+    agendador = AgendadorFaixas(criar_app(['ABC1D23']), faixas, espera_maxima=60)
+    for faixa in faixas:
+        agendador._capturar(faixa)
+
+    ordem = []
+    while (proximo := agendador._proximo()) is not None:
+        ordem.append(proximo[0].nome)
+    assert ordem == ['entrada1'] * 4 + ['saida1'] * 4
+
+
+def test_faixa_ociosa_so_envia_um_quadro_por_intervalo(tmp_path):
+    opcoes = dict(tamanho_fila=16, velocidade=0, tempo_ocioso=0, intervalo_ocioso=60)
+    parada = Faixa('parada', video_parado(tmp_path / 'parada.avi', 6), 'saida', **opcoes)
+    movimento = Faixa('movimento', video_com_movimento(tmp_path / 'movimento.avi', 6), 'saida', **opcoes)
+    agendador = AgendadorFaixas(criar_app(['ABC1D23']), [parada, movimento])
+    agendador._capturar(parada)
+    agendador._capturar(movimento)
+
+    assert (parada.contadores['quadros'], parada.contadores['enfileirados'], parada.contadores['throttled']) == (6, 1, 5)
+    # O primeiro quadro não tem com o que comparar; os seguintes têm movimento e passam todos
+    assert movimento.contadores['throttled'] <= 1
+    assert movimento.contadores['enfileirados'] >= 5
+
+
+def test_fila_cheia_descarta_os_quadros_mais_antigos(tmp_path):
+    faixa = Faixa('entrada1', video_com_movimento(tmp_path / 'faixa.avi', 6), tamanho_fila=2, velocidade=0)
+    agendador = AgendadorFaixas(criar_app(['ABC1D23']), [faixa])
+    agendador._capturar(faixa)
+
+    metricas = agendador.metricas()['entrada1']
+    assert (metricas['enfileirados'], metricas['descartados'], metricas['fila']) == (6, 4, 2)
+    assert [indice for _, indice, _, _ in faixa.fila] == [4, 5]
+
+
+class LeitorLento(LeitorFalso):
+    def readtext(self, imagem):
+        time.sleep(0.02)
+        return super().readtext(imagem)
+
+
+def test_metricas_de_latencia_incluem_a_espera_na_fila(tmp_path):
+    app = criar_app([])
+    app._reader = LeitorLento(['ABC1D23'])
+    faixa = Faixa('entrada1', video_com_movimento(tmp_path / 'faixa.avi', 6), tamanho_fila=8,
+                  descartar_quando_cheia=False, velocidade=0)
+    agendador = AgendadorFaixas(app, [faixa], workers=1)
+    agendador.iniciar()
+    metricas = agendador.aguardar(timeout=30)['entrada1']
+
+    assert metricas['processados'] == metricas['quadros'] == 6 and metricas['descartados'] == 0
+    assert len(faixa.latencias) == 6
+    # Os quadros chegam de uma vez (velocidade=0) e esperam o OCR dos anteriores: a média passa de um OCR
+    assert metricas['latencia_media_ms'] >= 20
+    assert metricas['latencia_p95_ms'] >= metricas['latencia_media_ms']
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip('streamlit')
+
+
+@pytest.fixture
+def sistema(tmp_path, monkeypatch):
+    # Importar o app executa a página em modo bare; o banco padrão fica na pasta temporária
+    monkeypatch.chdir(tmp_path)
+    import app
+    sistema = app.VehicleAccessSystem(str(tmp_path / 'acessos.db'))
+    yield sistema
+    sistema.conn.close()
+
+
+def test_visao_dos_colaboradores_com_consultas_fixas(sistema):
+    ana_lima = sistema.add_employee('Ana Lima', 'Gerente', 'TAG1', b'foto')
+    ana_souza = sistema.add_employee('Ana Souza', 'Vendedora', 'TAG2')
+    sistema.add_vehicle('ABC1D23', 'Gol', 'VW', 'Preto', ana_lima, 'Gerente')
+    sistema.add_vehicle('XYZ9K87', 'Uno', 'Fiat', 'Branco', ana_lima, 'Gerente')
+    veiculos = dict(sistema.conn.execute("SELECT placa, id FROM veiculos"))
+    sistema.conn.executemany("INSERT INTO acessos (veiculo_id, data_hora, acesso_permitido, observacoes) VALUES (?, ?, 1, '')",
+                             [(veiculos['ABC1D23'], f"2026-10-{dia:02d} 08:00:00") for dia in (3, 9, 1, 7, 5, 8, 2)]
+                             + [(veiculos['XYZ9K87'], '2026-10-04 09:00:00')])
+    sistema.conn.commit()
+
+    employees = sistema.get_employees_by_name('Ana')
+    consultas = []
+    sistema.conn.set_trace_callback(consultas.append)
+    overview = {item['employee'][0]: item for item in sistema.get_employees_overview(employees)}
+    sistema.conn.set_trace_callback(None)
+
+    # Uma consulta de veículos e uma de acessos para o lote; nenhuma volta a ler colaboradores/fotos
+    assert len(consultas) == 2
+    assert not any('colaboradores' in consulta for consulta in consultas)
+    assert overview[ana_lima]['employee'][4] == b'foto'
+    assert [veiculo[0] for veiculo in overview[ana_lima]['vehicles']] == ['ABC1D23', 'XYZ9K87']
+    assert [acesso[0] for acesso in overview[ana_lima]['accesses']['ABC1D23']] == [
+        f"2026-10-{dia:02d} 08:00:00" for dia in (9, 8, 7, 5, 3)]
+    assert [acesso[0] for acesso in overview[ana_lima]['accesses']['XYZ9K87']] == ['2026-10-04 09:00:00']
+    assert overview[ana_souza]['vehicles'] == [] and overview[ana_souza]['accesses'] == {}
@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+from arquivamento import arquivar_acessos, consultar_periodo
+
+CONSULTA = "SELECT data_hora, placa FROM {acessos} AS acessos ORDER BY data_hora DESC"
+
+
+def banco_arquivado(caminho, datas, meses_retencao=1):
+    # Esquema do PlacaReaderApp; todos os meses fora da retenção vão para os arquivos mensais
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE historico_acessos (id INTEGER PRIMARY KEY AUTOINCREMENT, placa TEXT, "
+                 "data_hora TEXT, liberado BOOLEAN, mensagem TEXT)")
+    conn.executemany("INSERT INTO historico_acessos (placa, data_hora, liberado) VALUES ('ABC1D23', ?, 1)",
+                     [(data,) for data in datas])
+    conn.commit()
+    arquivar_acessos(conn, caminho, meses_retencao)
+    return conn
+
+
+def anexos(conn):
+    comandos = []
+    conn.set_trace_callback(lambda sql: comandos.append(sql) if sql.startswith('ATTACH') else None)
+    return comandos
+
+
+def test_periodo_junta_arquivos_e_tabela_viva_em_ordem(tmp_path):
+    caminho = str(tmp_path / 'placas.db')
+    conn = banco_arquivado(caminho, ['2024-01-05 08:00:00', '2024-02-10 09:00:00', '2024-03-31 23:59:59'])
+    # Gravação antiga reprocessada depois do arquivamento fica na tabela viva
+    conn.executemany("INSERT INTO historico_acessos (placa, data_hora, liberado) VALUES ('XYZ9K87', ?, 1)",
+                     [('2024-02-20 10:00:00',), ('2026-10-19 08:00:00',)])
+    conn.commit()
+
+    datas = [data for data, _ in consultar_periodo(conn, caminho, CONSULTA)]
+    assert datas == ['2026-10-19 08:00:00', '2024-03-31 23:59:59', '2024-02-20 10:00:00',
+                     '2024-02-10 09:00:00', '2024-01-05 08:00:00']
+    assert consultar_periodo(conn, caminho, CONSULTA, '2024-02-10', '2024-03-31') == [
+        ('2024-03-31 23:59:59', 'ABC1D23'), ('2024-02-20 10:00:00', 'XYZ9K87'), ('2024-02-10 09:00:00', 'ABC1D23')]
+    assert consultar_periodo(conn, caminho, CONSULTA, '2024-02-11', '2024-02-19') == []
+
+
+def test_periodo_so_anexa_os_arquivos_necessarios(tmp_path):
+    caminho = str(tmp_path / 'placas.db')
+    conn = banco_arquivado(caminho, ['2024-01-05 08:00:00', '2024-02-10 09:00:00'])
+    conn.execute("INSERT INTO historico_acessos (placa, data_hora, liberado) VALUES ('XYZ9K87', '2026-10-19 08:00:00', 1)")
+    conn.commit()
+    comandos = anexos(conn)
+
+    assert consultar_periodo(conn, caminho, CONSULTA, '2026-10-01') == [('2026-10-19 08:00:00', 'XYZ9K87')]
+    assert comandos == []
+    assert consultar_periodo(conn, caminho, CONSULTA, '2024-02-01', '2024-02-28') == [('2024-02-10 09:00:00', 'ABC1D23')]
+    assert len(comandos) == 1 and comandos[0].endswith('AS arquivo_2024_02')
+
+
+def test_periodo_com_mais_meses_que_o_limite_de_anexos(tmp_path):
+    caminho = str(tmp_path / 'placas.db')
+    datas = [f"2023-{mes:02d}-15 12:00:00" for mes in range(1, 13)]
+    conn = banco_arquivado(caminho, datas)
+    comandos = anexos(conn)
+
+    assert [data for data, _ in consultar_periodo(conn, caminho, CONSULTA)] == datas[::-1]
+    assert len(comandos) == 12
+    assert conn.execute("PRAGMA database_list").fetchall()[1:] == []
+
+
+def test_periodo_nao_confirma_transacao_do_chamador(tmp_path):
+    caminho = str(tmp_path / 'placas.db')
+    conn = banco_arquivado(caminho, ['2024-01-05 08:00:00'])
+    conn.execute("INSERT INTO historico_acessos (placa, data_hora, liberado) VALUES ('XYZ9K87', '2026-10-19 08:00:00', 1)")
+
+    assert consultar_periodo(conn, caminho, CONSULTA, '2026-10-01') == [('2026-10-19 08:00:00', 'XYZ9K87')]
+    assert conn.in_transaction
+    with pytest.raises(ValueError):
+        consultar_periodo(conn, caminho, CONSULTA)
+    conn.rollback()
+    assert consultar_periodo(conn, caminho, CONSULTA) == [('2024-01-05 08:00:00', 'ABC1D23')]
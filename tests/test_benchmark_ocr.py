@@ -0,0 +1,20 @@
+import subprocess
+
+import benchmark_ocr
+
+SAIDA_IMPORTTIME = '''import time: self [us] | cumulative | imported package
+import time:        49 |         49 |   marshal
+import time:       514 |       2025 |   os
+import time:       300 |       2500 | site
+import time:       900 |       1200 |     numpy.core
+import time:     18027 |     128287 |   cv2
+import time:       200 |        466 |   estatisticas
+import time:       640 |     140934 | placa_reader
+import time:       300 |        300 |   outro_filho
+import time:       400 |        700 | outro_modulo
+'''
+
+
+def test_perfil_lista_os_imports_diretos_do_modulo(monkeypatch):
+    monkeypatch.setattr(subprocess, 'run', lambda *args, **kwargs: subprocess.CompletedProcess(args, 0, '', SAIDA_IMPORTTIME))
+    assert benchmark_ocr.perfil_importacao() == [(128.287, 'cv2'), (0.466, 'estatisticas')]
@@ -0,0 +1,73 @@
+import cv2
+import numpy as np
+
+from cache_ocr import _AUSENTE, CacheOCR, chave_imagem
+from sinteticos import criar_app, quadro_com_placa
+
+
+def test_placas_diferentes_no_mesmo_lugar_nao_colidem():
+    a, b = quadro_com_placa('ABC1D23'), quadro_com_placa('XYZ9K87')
+    app = criar_app(['ABC1D23', 'XYZ9K87'])
+
+    regiao_a = app.localizar_regiao_placa(cv2.cvtColor(a, cv2.COLOR_BGR2GRAY))
+    assert regiao_a == app.localizar_regiao_placa(cv2.cvtColor(b, cv2.COLOR_BGR2GRAY))
+    x0, y0, x1, y1 = regiao_a
+    assert chave_imagem(a[y0:y1, x0:x1]) != chave_imagem(b[y0:y1, x0:x1])
+
+    assert app.ler_placa_imagem(a) == 'ABC1D23'
+    assert app.ler_placa_imagem(b) == 'XYZ9K87'
+    assert app._reader.chamadas == 2
+
+
+def test_placas_que_diferem_em_um_caractere_nao_colidem():
+    app = criar_app(['ABC1D23', 'ABC1D28'])
+    assert app.ler_placa_imagem(quadro_com_placa('ABC1D23')) == 'ABC1D23'
+    assert app.ler_placa_imagem(quadro_com_placa('ABC1D28')) == 'ABC1D28'
+    assert app._reader.chamadas == 2
+
+
+def test_quadro_repetido_usa_cache_e_recorte_do_quadro_atual():
+    a = quadro_com_placa('ABC1D23')
+    app = criar_app(['ABC1D23'])
+    assert app.ler_placa_imagem(a) == 'ABC1D23'
+    placa, recorte = app.ler_placa_com_recorte(a.copy())
+    assert placa == 'ABC1D23' and recorte.shape[:2] == (50, 190)
+    assert app._reader.chamadas == 1
+
+
+def test_leitura_vazia_nao_fica_em_cache():
+    a = quadro_com_placa('ABC1D23')
+    app = criar_app([None, 'ABC1D23'])
+    assert app.ler_placa_imagem(a) is None
+    assert app.ler_placa_imagem(a) == 'ABC1D23'
+
+
+def test_quadro_sem_regiao_de_placa_nao_usa_cache():
+    vazio = np.full((480, 640, 3), 90, dtype=np.uint8)
+    app = criar_app(['ABC1D23', 'XYZ9K87'])
+    assert app.ler_placa_imagem(vazio) == 'ABC1D23'
+    assert app.ler_placa_imagem(vazio) == 'XYZ9K87'
+    assert app.cache_ocr.metricas()['entradas'] == 0
+
+
+def test_cache_expira_e_respeita_capacidade():
+    cache = CacheOCR(capacidade=2, ttl=300)
+    cache.guardar(1, 'A')
+    cache.guardar(2, 'B')
+    cache.guardar(4, 'C')
+    assert cache.metricas()['entradas'] == 2
+    assert cache.buscar(1) is _AUSENTE
+    assert cache.buscar(4) == 'C'
+    cache.ttl = -1
+    assert cache.buscar(4) is _AUSENTE
+
+
+def test_recorte_com_um_pixel_diferente_nao_usa_cache():
+    cache = CacheOCR()
+    recorte = quadro_com_placa('ABC1D23')[300:360, 220:420]
+    quase = recorte.copy()
+    quase[0, 0] = 0
+    assert cache.obter_ou_calcular(recorte, lambda _: 'ABC1D23') == ('ABC1D23', False)
+    assert cache.obter_ou_calcular(recorte.copy(), lambda _: 'outra') == ('ABC1D23', True)
+    assert cache.obter_ou_calcular(quase, lambda _: 'ABC1D28') == ('ABC1D28', False)
+    assert chave_imagem(recorte) != chave_imagem(recorte.reshape(200, 60, 3))
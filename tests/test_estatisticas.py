@@ -0,0 +1,88 @@
+import sqlite3
+from datetime import date
+
+from arquivamento import arquivar_acessos
+from estatisticas import (GRANULARIDADES, TABELA_PLACAS, acessos_por_periodo, acumular_acesso,
+                          criar_tabelas_estatisticas, reconstruir_estatisticas, taxa_negacao_por_tipo,
+                          top_veiculos)
+
+
+def banco_com_acessos(acessos):
+    conn = sqlite3.connect(':memory:')
+    criar_tabelas_estatisticas(conn)
+    cursor = conn.cursor()
+    for data_hora, placa, tipo, permitido in acessos:
+        acumular_acesso(cursor, data_hora, placa, tipo, permitido)
+    conn.commit()
+    return conn
+
+
+def test_intervalo_por_hora_inclui_o_ultimo_dia():
+    conn = banco_com_acessos([
+        ('2026-10-18 09:10:00', 'ABC1D23', 'Diretor', True),
+        ('2026-10-19 08:00:00', 'ABC1D23', 'Diretor', True),
+        ('2026-10-19 17:30:00', 'XYZ9K87', 'Visitante', False),
+    ])
+    assert acessos_por_periodo(conn, 'hora', date(2026, 10, 18), date(2026, 10, 19)) == [
+        ('2026-10-18 09', 1, 0), ('2026-10-19 08', 1, 0), ('2026-10-19 17', 0, 1)]
+    assert acessos_por_periodo(conn, 'dia', date(2026, 10, 19), date(2026, 10, 19)) == [('2026-10-19', 1, 1)]
+    assert acessos_por_periodo(conn, 'hora', date(2026, 10, 17), date(2026, 10, 17)) == []
+
+
+def contar(conn, tabela):
+    return conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+
+
+def test_tabelas_do_painel_nao_crescem_com_as_placas():
+    # 500 placas diferentes no mesmo dia e hora: uma linha por tipo e resultado no painel
+    conn = banco_com_acessos([('2026-10-19 08:15:00', f"ABC{numero:04d}", 'Funcionario', numero % 10 != 0)
+                              for numero in range(500)])
+    assert contar(conn, GRANULARIDADES['hora'][0]) == 2
+    assert contar(conn, GRANULARIDADES['dia'][0]) == 2
+    assert contar(conn, TABELA_PLACAS) == 500
+    assert taxa_negacao_por_tipo(conn, '2026-10-19', '2026-10-19') == [('Funcionario', 500, 50, 10.0)]
+
+
+def test_ranking_de_veiculos_usa_a_tabela_por_placa():
+    conn = banco_com_acessos([
+        ('2026-10-18 09:00:00', 'ABC1D23', 'Diretor', True),
+        ('2026-10-19 09:00:00', 'ABC1D23', 'Diretor', False),
+        ('2026-10-19 10:00:00', 'XYZ9K87', 'Visitante', True),
+        ('2026-10-19 11:00:00', '', '', False),
+    ])
+    assert top_veiculos(conn, '2026-10-18', '2026-10-19') == [('ABC1D23', 'Diretor', 2, 1), ('XYZ9K87', 'Visitante', 1, 0)]
+
+
+def banco_historico(caminho, acessos):
+    # Esquema do PlacaReaderApp: histórico com a placa na própria linha
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE historico_acessos (id INTEGER PRIMARY KEY AUTOINCREMENT, placa TEXT, "
+                 "data_hora TEXT, liberado BOOLEAN, mensagem TEXT)")
+    conn.executemany("INSERT INTO historico_acessos (placa, data_hora, liberado) VALUES (?, ?, ?)", acessos)
+    conn.commit()
+    return conn
+
+
+def test_reconstruir_com_tudo_arquivado_preserva_os_rollups(tmp_path):
+    caminho = str(tmp_path / 'placas.db')
+    conn = banco_historico(caminho, [('ABC1D23', '2024-01-05 08:00:00', 1), ('XYZ9K87', '2024-02-07 09:00:00', 0)])
+    assert reconstruir_estatisticas(conn, caminho) == 2
+    assert arquivar_acessos(conn, caminho, meses_retencao=1) == {'2024-01': 1, '2024-02': 1}
+    assert conn.execute("SELECT COUNT(*) FROM historico_acessos").fetchone()[0] == 0
+
+    assert reconstruir_estatisticas(conn, caminho) == 2
+    assert acessos_por_periodo(conn, 'dia') == [('2024-01-05', 1, 0), ('2024-02-07', 0, 1)]
+    assert top_veiculos(conn) == [('ABC1D23', '', 1, 0), ('XYZ9K87', '', 1, 1)]
+
+
+def test_reconstruir_soma_linhas_antigas_inseridas_depois_do_arquivamento(tmp_path):
+    caminho = str(tmp_path / 'placas.db')
+    conn = banco_historico(caminho, [('ABC1D23', '2024-01-05 08:00:00', 1), ('ABC1D23', '2026-10-19 08:00:00', 1)])
+    arquivar_acessos(conn, caminho, meses_retencao=1)
+    # Reprocessamento de uma gravação antiga (--inicio-gravacao) cai em um mês já arquivado
+    conn.execute("INSERT INTO historico_acessos (placa, data_hora, liberado) VALUES ('ABC1D23', '2024-01-05 08:30:00', 1)")
+    conn.commit()
+
+    assert reconstruir_estatisticas(conn, caminho) == 3
+    assert acessos_por_periodo(conn, 'hora', '2024-01-05', '2024-01-05') == [('2024-01-05 08', 2, 0)]
+    assert acessos_por_periodo(conn, 'dia', '2026-10-19', '2026-10-19') == [('2026-10-19', 1, 0)]
@@ -0,0 +1,30 @@
+import cv2
+
+from sinteticos import criar_app, quadro_com_placa
+
+
+def test_evidencia_do_acesso_pode_ser_exportada(tmp_path):
+    app = criar_app(['ABC1D23'], pasta_evidencias=str(tmp_path / 'evidencias'))
+    app.adicionar_placa_liberada('ABC1D23', 'Ana')
+    resultado = app.processar_imagem(quadro_com_placa('ABC1D23'))
+    assert resultado['liberado']
+    app.evidencias.aguardar_gravacoes()
+
+    id_acesso = app.conn.execute("SELECT MAX(id) FROM historico_acessos").fetchone()[0]
+    saida = app.exportar_evidencia(id_acesso, str(tmp_path / 'evidencia.jpg'))
+    imagem = cv2.imread(saida)
+    assert imagem.shape[:2] == (50, 190)
+    assert app.exportar_evidencia(id_acesso + 1) is None
+    app.evidencias.fechar()
+
+
+def test_evidencia_fica_no_id_do_acesso_registrado(tmp_path):
+    app = criar_app(['ABC1D23'], pasta_evidencias=str(tmp_path / 'evidencias'))
+    recorte = quadro_com_placa('ABC1D23')[300:360, 220:420]
+    ids = [app.registrar_acesso({'placa': placa, 'liberado': True, 'mensagem': ''}, data_hora, recorte)
+           for placa, data_hora in [('ABC1D23', '2026-01-01 10:00:00'), ('XYZ9K87', '2026-01-02 11:00:00')]]
+    app.evidencias.aguardar_gravacoes()
+
+    assert ids == [linha[0] for linha in app.conn.execute("SELECT id FROM historico_acessos ORDER BY id")]
+    assert all(app.evidencias.possui(id_acesso) for id_acesso in ids)
+    app.evidencias.fechar()
@@ -0,0 +1,93 @@
+import sqlite3
+
+from importacao import importar_colaboradores
+
+
+def banco_colaboradores(colaboradores):
+    # Mesmo esquema de colaboradores do app.py
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE colaboradores (
+            id TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            cargo TEXT NOT NULL,
+            tag_id TEXT UNIQUE,
+            foto BLOB,
+            ativo BOOLEAN DEFAULT 1
+        )
+    ''')
+    conn.executemany("INSERT INTO colaboradores (id, nome, cargo, tag_id) VALUES (?, ?, ?, ?)", colaboradores)
+    conn.commit()
+    return conn
+
+
+def gravar_csv(caminho, linhas):
+    caminho.write_text('\n'.join(linhas) + '\n', encoding='utf-8')
+    return str(caminho)
+
+
+def test_id_existente_com_tag_nova_atualiza_o_colaborador(tmp_path):
+    conn = banco_colaboradores([('c1', 'Ana', 'Gerente', 'TAG1'), ('c2', 'Bruno', 'Vendedor', 'TAG2')])
+    arquivo = gravar_csv(tmp_path / 'rh.csv', [
+        'id,nome,cargo,tag_id',
+        'c1,Ana Lima,Diretora,TAG9',   # troca de crachá
+        ',Bruno,Gerente,TAG2',         # sem id: encontrado pelo tag_id
+        ',Carla,Vendedora,TAG3',       # novo
+    ])
+    resumo = importar_colaboradores(conn, arquivo)
+    assert (resumo['inseridos'], resumo['atualizados'], resumo['rejeitados']) == (1, 2, 0)
+    colaboradores = dict(conn.execute("SELECT id, tag_id FROM colaboradores").fetchall())
+    assert colaboradores['c1'] == 'TAG9' and colaboradores['c2'] == 'TAG2'
+    assert sorted(colaboradores.values()) == ['TAG2', 'TAG3', 'TAG9']
+
+
+def test_tag_de_outro_colaborador_rejeita_so_o_registro(tmp_path):
+    conn = banco_colaboradores([('c1', 'Ana', 'Gerente', 'TAG1'), ('c2', 'Bruno', 'Vendedor', 'TAG2')])
+    arquivo = gravar_csv(tmp_path / 'rh.csv', [
+        'id,nome,cargo,tag_id',
+        'c1,Ana,Gerente,TAG2',
+        'c2,Bruno Souza,Vendedor,TAG2',
+    ])
+    resumo = importar_colaboradores(conn, arquivo)
+    assert resumo['erros'] == [(1, 'tag_id repetido no arquivo')]
+    arquivo = gravar_csv(tmp_path / 'rh2.csv', ['id,nome,cargo,tag_id', 'c1,Ana,Gerente,TAG2', 'c2,Bruno Souza,Vendedor,TAG2b'])
+    resumo = importar_colaboradores(conn, arquivo)
+    assert resumo['erros'] == [(1, 'tag_id já pertence a outro colaborador')]
+    assert resumo['atualizados'] == 1
+    assert conn.execute("SELECT nome, tag_id FROM colaboradores WHERE id = 'c2'").fetchone() == ('Bruno Souza', 'TAG2b')
+    assert conn.execute("SELECT tag_id FROM colaboradores WHERE id = 'c1'").fetchone() == ('TAG1',)
+
+
+def test_jsonl_numerico_mantem_ids_como_texto(tmp_path):
+    conn = banco_colaboradores([('123', 'Ana', 'Gerente', '456')])
+    arquivo = tmp_path / 'rh.jsonl'
+    arquivo.write_text('\n'.join([
+        '{"id": 123, "nome": "Ana", "cargo": "Diretora", "tag_id": 456}',
+        '{"id": null, "nome": "Bruno", "cargo": "Vendedor", "tag_id": 789}',
+    ]) + '\n', encoding='utf-8')
+    resumo = importar_colaboradores(conn, str(arquivo))
+    assert (resumo['inseridos'], resumo['atualizados'], resumo['rejeitados']) == (1, 1, 0)
+    assert conn.execute("SELECT cargo, tag_id FROM colaboradores WHERE id = '123'").fetchone() == ('Diretora', '456')
+    assert conn.execute("SELECT tag_id FROM colaboradores WHERE nome = 'Bruno'").fetchone() == ('789',)
+
+
+def test_sem_coluna_ativo_mantem_situacao_atual(tmp_path):
+    conn = banco_colaboradores([('c1', 'Ana', 'Gerente', 'TAG1'), ('c2', 'Bruno', 'Vendedor', 'TAG2')])
+    conn.execute("UPDATE colaboradores SET ativo = 0 WHERE id = 'c1'")
+    conn.commit()
+    importar_colaboradores(conn, gravar_csv(tmp_path / 'rh.csv', [
+        'id,nome,cargo,tag_id',
+        'c1,Ana,Gerente,TAG1',
+        'c2,Bruno,Vendedor,TAG2',
+        'c3,Carla,Vendedora,TAG3',
+    ]))
+    ativos = dict(conn.execute("SELECT id, ativo FROM colaboradores").fetchall())
+    assert ativos == {'c1': 0, 'c2': 1, 'c3': 1}
+    importar_colaboradores(conn, gravar_csv(tmp_path / 'rh2.csv', [
+        'id,nome,cargo,tag_id,ativo',
+        'c1,Ana,Gerente,TAG1,sim',
+        'c2,Bruno,Vendedor,TAG2,0',
+        'c3,Carla,Vendedora,TAG3,',
+    ]))
+    ativos = dict(conn.execute("SELECT id, ativo FROM colaboradores").fetchall())
+    assert ativos == {'c1': 1, 'c2': 0, 'c3': 1}
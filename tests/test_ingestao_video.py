@@ -0,0 +1,76 @@
+import json
+from datetime import datetime
+
+import cv2
+
+import ingestao_video
+from ingestao_video import amostrar_quadros, ingerir_fonte
+from sinteticos import criar_app, gravar_video, quadro_com_placa
+
+
+def video_com_placa(caminho, quantidade=25):
+    # 10 quadros por segundo: o quadro N está em N * 100 ms
+    gravar_video(caminho, [quadro_com_placa('ABC1D23')] * quantidade)
+    return str(caminho)
+
+
+def test_modo_chave_sem_leitura_de_pacotes_usa_amostragem_temporal(tmp_path, monkeypatch):
+    video = tmp_path / 'gravacao.avi'
+    gravar_video(video, [quadro_com_placa('ABC1D23')] * 25)
+    abrir_original = ingestao_video.abrir_fonte
+
+    def abrir_sem_pacotes(fonte, apenas_pacotes=False):
+        # Simula um backend que recusa CAP_PROP_FORMAT=-1
+        return cv2.VideoCapture() if apenas_pacotes else abrir_original(fonte)
+
+    monkeypatch.setattr(ingestao_video, 'abrir_fonte', abrir_sem_pacotes)
+    monkeypatch.setattr(ingestao_video, 'suporta_quadros_chave', lambda: True)
+    indices = [indice for indice, _, _ in amostrar_quadros(str(video), 'chave', intervalo=1.0)]
+    assert indices == [0, 10, 20]
+
+
+def test_amostragem_por_passo_e_por_tempo(tmp_path):
+    video = video_com_placa(tmp_path / 'gravacao.avi')
+    assert [indice for indice, _, _ in amostrar_quadros(video, 'passo', passo=4)] == [0, 4, 8, 12, 16, 20, 24]
+    amostras = [(indice, round(tempo_ms)) for indice, tempo_ms, _ in amostrar_quadros(video, 'tempo', intervalo=0.5)]
+    assert amostras == [(0, 0), (5, 500), (10, 1000), (15, 1500), (20, 2000)]
+
+
+def test_saida_jsonl_ou_banco_do_app(tmp_path):
+    video = video_com_placa(tmp_path / 'gravacao.avi', 10)
+    saida = tmp_path / 'decisoes.jsonl'
+    app = criar_app(['ABC1D23'])
+    app.adicionar_placa_liberada('ABC1D23', 'Ana')
+
+    resumo = ingerir_fonte(app, video, 'passo', passo=5, saida=str(saida))
+    decisoes = [json.loads(linha) for linha in saida.read_text(encoding='utf-8').splitlines()]
+    assert resumo == {'quadros': 2, 'decisoes': 1, 'liberados': 1, 'negados': 0, 'nao_reconhecidos': 0}
+    assert [(decisao['placa'], decisao['liberado'], decisao['quadro']) for decisao in decisoes] == [('ABC1D23', True, 0)]
+    assert app.conn.execute("SELECT COUNT(*) FROM historico_acessos").fetchone()[0] == 0
+
+    ingerir_fonte(app, video, 'passo', passo=5)
+    assert app.conn.execute("SELECT placa, liberado FROM historico_acessos").fetchall() == [('ABC1D23', 1)]
+
+
+def test_leituras_repetidas_da_mesma_placa_geram_uma_decisao_por_intervalo(tmp_path):
+    video = video_com_placa(tmp_path / 'gravacao.avi', 20)
+    # Sem cache, cada quadro passa pelo leitor falso na ordem da lista
+    app = criar_app(['ABC1D23'] * 3 + [None, 'XYZ9K87'] + ['ABC1D23'] * 15, cache_capacidade=0)
+    saida = tmp_path / 'decisoes.jsonl'
+
+    resumo = ingerir_fonte(app, video, saida=str(saida), intervalo_repeticao=1.0)
+    decisoes = [json.loads(linha) for linha in saida.read_text(encoding='utf-8').splitlines()]
+    # ABC1D23 volta a ser decidida só 1 s depois da primeira decisão (quadro 10)
+    assert [(decisao['placa'], decisao['quadro']) for decisao in decisoes] == [
+        ('ABC1D23', 0), ('XYZ9K87', 4), ('ABC1D23', 10)]
+    assert (resumo['quadros'], resumo['decisoes'], resumo['nao_reconhecidos']) == (20, 3, 1)
+
+
+def test_inicio_gravacao_define_a_data_hora_das_decisoes(tmp_path):
+    video = video_com_placa(tmp_path / 'gravacao.avi')
+    app = criar_app(['ABC1D23', 'XYZ9K87', 'ABC1D23'], cache_capacidade=0)
+
+    ingerir_fonte(app, video, 'passo', passo=10, inicio_gravacao=datetime(2024, 1, 5, 23, 59, 59),
+                  intervalo_repeticao=0)
+    assert app.conn.execute("SELECT placa, data_hora FROM historico_acessos ORDER BY id").fetchall() == [
+        ('ABC1D23', '2024-01-05 23:59:59'), ('XYZ9K87', '2024-01-06 00:00:00'), ('ABC1D23', '2024-01-06 00:00:01')]
@@ -0,0 +1,90 @@
+import numpy as np
+
+from ocr_onnx import ALTURA_RECONHECEDOR, LeitorOCROnnx
+
+
+class SessaoFalsa:
+    # Substitui a InferenceSession do onnxruntime: guarda as entradas e devolve saida(entrada)
+    def __init__(self, saida):
+        self.saida = saida
+        self.entradas = []
+
+    def run(self, nomes, entradas):
+        self.entradas.append(entradas['imagem'])
+        return [self.saida(entradas['imagem'])]
+
+
+def criar_leitor(detector, reconhecedor, caracteres='-ABC', **opcoes):
+    # Sem passar pelo __init__, que abre os modelos exportados
+    leitor = LeitorOCROnnx.__new__(LeitorOCROnnx)
+    configuracao = dict(tamanho_maximo=1280, limiar_texto=0.7, limiar_baixo=0.4, limiar_ligacao=0.4,
+                        limiar_centro=0.5, limiar_altura=0.5, limiar_distancia=0.5)
+    configuracao.update(opcoes)
+    leitor.__dict__.update(configuracao, detector=detector, reconhecedor=reconhecedor,
+                           caracteres=['[blank]'] + list(caracteres[1:]))
+    return leitor
+
+
+def logits_para(indices, classes=4):
+    logits = np.full((1, len(indices), classes), -5.0, dtype=np.float32)
+    for passo, indice in enumerate(indices):
+        logits[0, passo, indice] = 5.0
+    return logits
+
+
+def mapas_com_blocos(blocos):
+    # Mapas do CRAFT (metade da resolução da entrada) com texto nos retângulos (x0, y0, x1, y1)
+    def saida(entrada):
+        mapas = np.zeros((1, entrada.shape[2] // 2, entrada.shape[3] // 2, 2), dtype=np.float32)
+        for x0, y0, x1, y1 in blocos:
+            mapas[0, y0:y1, x0:x1, 0] = 0.9
+        return mapas
+    return saida
+
+
+def test_decodificacao_ctc_colapsa_repeticoes_e_remove_o_branco():
+    reconhecedor = SessaoFalsa(lambda entrada: logits_para([1, 1, 0, 1, 2, 2, 0, 0, 3]))
+    leitor = criar_leitor(None, reconhecedor)
+    texto, confianca = leitor._reconhecer(np.full((20, 60), 128, dtype=np.uint8))
+    assert texto == 'AABC'
+    assert 0.99 < confianca <= 1.0
+    # Altura fixa do modelo, largura proporcional, valores em [-1, 1]
+    assert reconhecedor.entradas[0].shape == (1, 1, ALTURA_RECONHECEDOR, 192)
+    assert np.allclose(reconhecedor.entradas[0], 128 / 255.0 * 2 - 1, atol=1e-6)
+    so_branco = criar_leitor(None, SessaoFalsa(lambda entrada: logits_para([0, 0])))
+    assert so_branco._reconhecer(np.zeros((20, 60), dtype=np.uint8)) == ('', 0.0)
+
+
+def test_caixas_voltam_na_escala_da_imagem_original():
+    # 200x400 com lado maior limitado a 200: escala 0,5, entrada 100x200 completada para 128x224
+    detector = SessaoFalsa(mapas_com_blocos([(10, 5, 30, 10)]))
+    leitor = criar_leitor(detector, None, tamanho_maximo=200)
+    caixas = leitor._detectar(np.zeros((200, 400, 3), dtype=np.uint8))
+
+    entrada = detector.entradas[0]
+    assert entrada.shape == (1, 3, 128, 224)
+    # A área completada fica com o valor normalizado do preto
+    assert np.allclose(entrada[0, 0, 100:, :], -0.485 / 0.229, atol=1e-4)
+    assert np.allclose(entrada[0, 0, :, 200:], -0.485 / 0.229, atol=1e-4)
+    # Bloco de 20x5 no mapa: margem int(sqrt(100 * 5 / 100) * 2) = 4, fator 2 / 0,5 = 4
+    assert caixas == [(24, 4, 136, 56)]
+
+
+def test_placa_separada_em_duas_caixas_e_lida_de_uma_vez():
+    # 'ABC' e '1D23' detectados como componentes separados na mesma linha, além de texto em outra linha
+    detector = SessaoFalsa(mapas_com_blocos([(10, 20, 40, 30), (60, 20, 96, 30), (10, 60, 40, 70)]))
+    reconhecedor = SessaoFalsa(lambda entrada: logits_para([1, 2, 3]))
+    leitor = criar_leitor(detector, reconhecedor)
+    imagem = np.zeros((200, 400, 3), dtype=np.uint8)
+    assert sorted(leitor._detectar(imagem)) == [(8, 28, 92, 72), (8, 108, 92, 152), (108, 28, 204, 72)]
+
+    caixas = [caixa for caixa, _, _ in leitor.readtext(imagem)]
+    assert caixas == [[[8, 28], [204, 28], [204, 72], [8, 72]], [[8, 108], [92, 108], [92, 152], [8, 152]]]
+    assert [entrada.shape[3] for entrada in reconhecedor.entradas] == [int(64 * 196 / 44), int(64 * 84 / 44)]
+
+
+def test_caixas_distantes_ou_de_alturas_diferentes_nao_se_juntam():
+    leitor = criar_leitor(None, None)
+    assert leitor._agrupar([(0, 0, 40, 20), (45, 2, 90, 22)]) == [(0, 0, 90, 22)]
+    assert leitor._agrupar([(0, 0, 40, 20), (60, 0, 100, 20)]) == [(0, 0, 40, 20), (60, 0, 100, 20)]
+    assert leitor._agrupar([(0, 0, 40, 20), (42, 0, 80, 60)]) == [(0, 0, 40, 20), (42, 0, 80, 60)]